@@ -0,0 +1,60 @@
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 7
+LIB_IMPORT_BUDGET_MS = 100.0
+HELP_BUDGET_MS = 300.0
+SCRIPTS = ['rename_runways.py', 'derive_runways.py', 'export_scenery.py', 'diff_bgl.py']
+
+
+def import_time_ms(module: str) -> float:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise Exception('No import time found for ' + module)
+
+
+def imported_modules(args: list) -> set:
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT, capture_output=True, text=True,
+                            check=True)
+    return {line.split('|')[2].strip() for line in result.stderr.splitlines() if line.count('|') == 2}
+
+
+def wall_time_ms(args: list) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    import_time_ms('lib.rename')
+    lib_import = statistics.median(import_time_ms('lib.rename') for _ in range(RUNS))
+    help_time = statistics.median(wall_time_ms(['rename_runways.py', '--help']) for _ in range(RUNS))
+    help_imports = {script: sorted(m for m in imported_modules([script, '--help']) if m.startswith('lib'))
+                    for script in SCRIPTS}
+
+    failed = False
+    print('import lib.rename: ' + format(lib_import, '.1f') + ' ms (budget ' + str(LIB_IMPORT_BUDGET_MS) + ' ms)')
+    if lib_import > LIB_IMPORT_BUDGET_MS:
+        failed = True
+    print('rename_runways.py --help: ' + format(help_time, '.1f') + ' ms (budget ' + str(HELP_BUDGET_MS) + ' ms)')
+    if help_time > HELP_BUDGET_MS:
+        failed = True
+    for script, modules in help_imports.items():
+        if modules:
+            print(script + ' --help imports ' + ', '.join(modules))
+            failed = True
+    if failed:
+        print('Import time budget exceeded.')
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.parallel import free_threaded, parse_bgl_parallel
+from lib.parser import read_bgl
+from tests.synthetic import build_bgl, waypoint
+
+RUNS = 3
+SUBSECTIONS = 40
+WAYPOINTS_PER_SUBSECTION = 2500
+GIL_TOLERANCE = 1.1
+
+
+def best_time(func, path: Path) -> float:
+    times = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        func(path)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory).joinpath('navdata.bgl')
+        path.write_bytes(build_bgl([(0x22, [[waypoint(str(x * WAYPOINTS_PER_SUBSECTION + y).zfill(5), 'K2',
+                                                      y * 0.01, x * 0.01) for y in range(WAYPOINTS_PER_SUBSECTION)]
+                                             for x in range(SUBSECTIONS)])]))
+        serial = best_time(read_bgl, path)
+        parallel = best_time(parse_bgl_parallel, path)
+
+    print('serial: ' + format(serial, '.2f') + ' s')
+    print('parallel: ' + format(parallel, '.2f') + ' s (' + ('free-threaded' if free_threaded() else 'GIL')
+          + ', ' + str(os.cpu_count()) + ' CPUs)')
+    if free_threaded() and (os.cpu_count() or 1) > 1:
+        failed = parallel >= serial
+    else:
+        # With the GIL -P parses serially and must not add overhead.
+        failed = parallel > serial * GIL_TOLERANCE
+    if failed:
+        print('Parallel parsing is slower than serial parsing.')
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
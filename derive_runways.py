@@ -0,0 +1,54 @@
+from __future__ import annotations
+import argparse
+import csv
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+MSFS_ROOT = Path('G:/MSFS/Microsoft Flight Simulator')
+OUTPUT = Path('runways_derived.csv')
+TOLERANCE = 0.0
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Writes the runway ends whose number does not match their '
+                                                 'magnetic heading to a change list in runways.csv format.')
+    parser.add_argument('-r', dest='msfs_root', type=Path, default=MSFS_ROOT,
+                        help='root path of the MSFS data folder, paths inside it are written with <msfs>')
+    parser.add_argument('-o', dest='output', type=Path, default=OUTPUT,
+                        help='output file (default runways_derived.csv)')
+    parser.add_argument('-t', dest='tolerance', type=float, default=TOLERANCE,
+                        help='tolerance in degrees on top of the 5 degrees of a runway number (default 0)')
+    parser.add_argument('scan_dirs', nargs='*', type=Path,
+                        help='directories to scan (default MSFS data folder)')
+    return parser.parse_args(argv)
+
+
+def csv_path(bgl: Path, root: Path) -> str:
+    if bgl.absolute().is_relative_to(root.absolute()):
+        return '<msfs>' + os.sep + str(bgl.absolute().relative_to(root.absolute()))
+    return str(bgl)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    from lib.analysis import find_runway_renumbers
+
+    count = 0
+    with open(args.output, 'w', newline='') as csvFile:
+        writer = csv.writer(csvFile, delimiter=';')
+        for scan_dir in args.scan_dirs or [args.msfs_root]:
+            print(scan_dir)
+            for renumber in find_runway_renumbers(scan_dir, args.tolerance):
+                print(renumber)
+                end = renumber.end
+                writer.writerow([csv_path(end.bgl, args.msfs_root), end.airport, end.number + end.designator,
+                                 renumber.new_number + end.designator])
+                count += 1
+    print(count, 'runway ends to renumber written to', args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Compares two BGL files or two directories of BGLs record by '
+                                                 'record.')
+    parser.add_argument('old', type=Path, help='old BGL file or directory')
+    parser.add_argument('new', type=Path, help='new BGL file or directory')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    from lib.diff import diff_files, diff_trees
+
+    if args.old.is_dir() and args.new.is_dir():
+        changed = 0
+        for relative, status, diff in diff_trees(args.old, args.new):
+            print(status + ': ' + str(relative))
+            if diff is not None:
+                diff.print(1)
+            changed += 1
+        print(changed, 'files changed')
+    elif args.old.is_file() and args.new.is_file():
+        diff = diff_files(args.old, args.new)
+        diff.print()
+        print(len(diff.added), 'added,', len(diff.removed), 'removed,', len(diff.modified), 'modified')
+    else:
+        raise Exception('Both arguments must be BGL files or both must be directories.')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+MSFS_ROOT = Path('G:/MSFS/Microsoft Flight Simulator')
+FORMAT = 'sqlite'
+OUTPUT = None
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Exports the records of all BGLs into indexed tables.')
+    parser.add_argument('-r', dest='msfs_root', type=Path, default=MSFS_ROOT,
+                        help='root path of the MSFS data folder')
+    parser.add_argument('-f', dest='format', choices=['sqlite', 'parquet'], default=FORMAT,
+                        help='output format, parquet requires pyarrow (default sqlite)')
+    parser.add_argument('-o', dest='output', type=Path, default=OUTPUT,
+                        help='output database file (default scenery.sqlite) or directory (default scenery_parquet)')
+    parser.add_argument('scan_dirs', nargs='*', type=Path,
+                        help='directories to export (default MSFS data folder)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    from lib.export import ParquetExporter, SqliteExporter
+
+    if args.format == 'sqlite':
+        exporter = SqliteExporter(args.output or Path('scenery.sqlite'))
+    else:
+        exporter = ParquetExporter(args.output or Path('scenery_parquet'))
+    try:
+        for scan_dir in args.scan_dirs or [args.msfs_root]:
+            print(scan_dir)
+            exported, skipped, removed, failed = exporter.export_tree(scan_dir)
+            print('exported=' + str(exported) + ' unchanged=' + str(skipped) + ' removed=' + str(removed)
+                  + ' failed=' + str(failed))
+    finally:
+        exporter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,22 @@
-from .util import *
-from .classes import *
-from .parser import *
-from .consts import *
+import importlib
+
+_MODULES = ['util', 'classes', 'parser', 'consts', 'index', 'scenery', 'coords', 'analysis', 'export', 'state',
+            'bloom', 'overlay', 'diff', 'progress', 'rename',
+            'aio', 'parallel', 'layers', 'cache']
+
+
+def _load_all() -> dict:
+    names = {}
+    for module_name in _MODULES:
+        module = importlib.import_module('.' + module_name, __name__)
+        names.update({name: value for name, value in vars(module).items() if not name.startswith('_')})
+    return names
+
+
+def __getattr__(name: str):
+    names = _load_all()
+    globals().update(names)
+    globals()['__all__'] = list(names)
+    if name == '__all__' or name in names:
+        return globals()[name]
+    raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
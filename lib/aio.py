@@ -0,0 +1,86 @@
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, Tuple, TypeVar
+
+from .classes import *
+from .parser import *
+from .rename import *
+
+MAX_OPEN_FILES = 8
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+_END = object()
+_output_lock = threading.Lock()
+
+
+async def iter_bounded(items: Iterable[T], func: Callable[[T], R], max_open: int = MAX_OPEN_FILES,
+                       executor: Optional[Executor] = None) -> AsyncIterator[R]:
+    # At most max_open calls are in flight, the next one is only started once a result was consumed.
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_open)
+    items = iter(items)
+    pending = set()
+    try:
+        for item in items:
+            pending.add(loop.run_in_executor(executor, func, item))
+            if len(pending) >= max_open:
+                break
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                item = next(items, _END)
+                if item is not _END:
+                    pending.add(loop.run_in_executor(executor, func, item))
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def parse_bgl_async(path: Path, executor: Optional[Executor] = None) -> Bgl:
+    return await asyncio.get_running_loop().run_in_executor(executor, read_bgl, path)
+
+
+async def iter_parse_bgls_async(paths: Iterable[Path], max_open: int = MAX_OPEN_FILES,
+                                executor: Optional[Executor] = None) -> AsyncIterator[Tuple[Path, Bgl]]:
+    async for result in iter_bounded(paths, lambda path: (path, read_bgl(path)), max_open, executor):
+        yield result
+
+
+async def iter_apply_changes_async(changes: Iterable[RunwayChange], root: Optional[Path] = None,
+                                   options: Optional[RenameOptions] = None, max_open: int = MAX_OPEN_FILES,
+                                   executor: Optional[Executor] = None) -> AsyncIterator[FileResult]:
+    options = options or RenameOptions()
+    loop = asyncio.get_running_loop()
+    runway_changes, state, progress = await loop.run_in_executor(executor, prepare_run, changes, root, options)
+
+    def process(bgl_file: Path) -> FileResult:
+        # Several files are processed at once, so the messages of each file are printed as one block when it is done.
+        out = io.StringIO()
+        try:
+            return process_bgl(bgl_file, runway_changes[bgl_file], root, options, state, progress, out)
+        finally:
+            with _output_lock:
+                progress.clear()
+                sys.stdout.write(out.getvalue())
+                sys.stdout.flush()
+
+    async for result in iter_bounded(list(runway_changes), process, max_open, executor):
+        yield result
+    await loop.run_in_executor(executor, progress.finish)
+
+
+async def apply_changes_async(changes: Iterable[RunwayChange], root: Optional[Path] = None,
+                              options: Optional[RenameOptions] = None, max_open: int = MAX_OPEN_FILES,
+                              executor: Optional[Executor] = None) -> List[FileResult]:
+    return [result async for result in iter_apply_changes_async(changes, root, options, max_open, executor)]
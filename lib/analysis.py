@@ -0,0 +1,111 @@
+import math
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from .classes import *
+from .parser import *
+from .scenery import *
+
+BATCH_SIZE = 4096
+
+
+class RunwayEnd:
+    bgl: Path
+    airport: str
+    number: str
+    designator: str
+    heading: float
+    magvar: float
+
+    def __init__(self, bgl: Path, airport: str, number: str, designator: str, heading: float,
+                 magvar: float) -> None:
+        self.bgl = bgl
+        self.airport = airport
+        self.number = number
+        self.designator = designator
+        self.heading = heading
+        self.magvar = magvar
+
+    def __str__(self) -> str:
+        return self.airport + ' ' + self.number + self.designator
+
+
+class RunwayRenumber:
+    end: RunwayEnd
+    magnetic_heading: float
+    new_number: str
+
+    def __init__(self, end: RunwayEnd, magnetic_heading: float, new_number: str) -> None:
+        self.end = end
+        self.magnetic_heading = magnetic_heading
+        self.new_number = new_number
+
+    def __str__(self) -> str:
+        return (str(self.end) + ' -> ' + self.new_number + self.end.designator + ' (magnetic heading '
+                + format(self.magnetic_heading, '.1f') + ')')
+
+
+def iter_runway_ends(path: Path, airports: Iterable[Airport]) -> Iterator[RunwayEnd]:
+    for airport in airports:
+        for runway in airport.runways:
+            for number, designator, heading in (
+                    (runway.primary_number, runway.primary_designation, runway.heading.val),
+                    (runway.secondary_number, runway.secondary_designation, runway.heading.val + 180.0)):
+                if 1 <= number.val <= 36:
+                    yield RunwayEnd(path, airport.ident.val, number.display, designator.display, heading,
+                                    airport.magvar.val)
+
+
+def magnetic_headings(headings: Sequence[float], magvars: Sequence[float]) -> Sequence[float]:
+    np = optional_import('numpy')
+    if np is not None:
+        return np.mod(np.asarray(headings, dtype=np.float64) + np.asarray(magvars, dtype=np.float64), 360.0)
+    return array('d', [(h + m) % 360.0 for h, m in zip(headings, magvars)])
+
+
+def runway_numbers(magnetic: Sequence[float]) -> Sequence[int]:
+    np = optional_import('numpy')
+    if np is not None:
+        return (np.floor(np.asarray(magnetic) / 10.0 + 0.5).astype(np.int64) - 1) % 36 + 1
+    return array('q', [(math.floor(m / 10.0 + 0.5) - 1) % 36 + 1 for m in magnetic])
+
+
+def runway_number_deviations(magnetic: Sequence[float], numbers: Sequence[int]) -> Sequence[float]:
+    np = optional_import('numpy')
+    if np is not None:
+        diff = np.abs(np.asarray(magnetic) - np.asarray(numbers, dtype=np.float64) * 10.0) % 360.0
+        return np.minimum(diff, 360.0 - diff)
+    deviations = array('d')
+    for m, n in zip(magnetic, numbers):
+        diff = abs(m - n * 10.0) % 360.0
+        deviations.append(min(diff, 360.0 - diff))
+    return deviations
+
+
+def _derive_batch(ends: List[RunwayEnd], tolerance: float) -> Iterator[RunwayRenumber]:
+    magnetic = magnetic_headings([e.heading for e in ends], [e.magvar for e in ends])
+    current = [int(e.number) for e in ends]
+    derived = runway_numbers(magnetic)
+    deviations = runway_number_deviations(magnetic, current)
+    for i, end in enumerate(ends):
+        if derived[i] != current[i] and deviations[i] > 5.0 + tolerance:
+            yield RunwayRenumber(end, float(magnetic[i]), str(int(derived[i])).zfill(2))
+
+
+def find_runway_renumbers(root: Path, tolerance: float = 0.0) -> Iterator[RunwayRenumber]:
+    batch = []
+    for path in iter_bgl_files(root):
+        try:
+            with open(path, 'rb') as f:
+                ends = list(iter_runway_ends(path, iter_airports(f)))
+        except Exception as e:
+            print('ERROR: Reading', path, 'failed:', repr(e))
+            continue
+        for end in ends:
+            batch.append(end)
+            if len(batch) >= BATCH_SIZE:
+                yield from _derive_batch(batch, tolerance)
+                batch = []
+    if batch:
+        yield from _derive_batch(batch, tolerance)
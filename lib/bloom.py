@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Tuple
+
+from .consts import *
+from .parser import *
+from .scenery import *
+
+BUNDLE_VERSION = 1
+FALSE_POSITIVE_RATE = 0.01
+
+
+class BloomFilter:
+    bit_count: int
+    hash_count: int
+    bits: bytearray
+
+    def __init__(self, bit_count: int, hash_count: int, bits: Optional[bytes] = None) -> None:
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.bits = bytearray(bits) if bits is not None else bytearray((bit_count + 7) // 8)
+
+    @staticmethod
+    def for_capacity(count: int, false_positive_rate: float = FALSE_POSITIVE_RATE) -> BloomFilter:
+        count = max(count, 1)
+        bit_count = max(64, math.ceil(-count * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        hash_count = max(1, round(bit_count / count * math.log(2)))
+        return BloomFilter(bit_count, hash_count)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode('utf8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, key: str) -> NoReturn:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def ident_key(section: Section, ident: str) -> str:
+    return section.name + ':' + ident
+
+
+def build_ident_filter(f: BinaryIO) -> BloomFilter:
+    keys = {ident_key(section, ident) for section, ident, _, _ in iter_idents(f)}
+    bloom = BloomFilter.for_capacity(len(keys))
+    for key in keys:
+        bloom.add(key)
+    return bloom
+
+
+class FilterBundle:
+    path: Path
+    filters: Dict[str, Tuple[int, int, BloomFilter]]
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.filters = {}
+        if path.exists():
+            with open(path, 'r') as bundle_file:
+                data = json.load(bundle_file)
+            if data.get('version') == BUNDLE_VERSION:
+                for bgl, (size, mtime, bit_count, hash_count, bits) in data['filters'].items():
+                    self.filters[bgl] = (size, mtime, BloomFilter(bit_count, hash_count, base64.b64decode(bits)))
+
+    def save(self) -> NoReturn:
+        filters = {}
+        for bgl, (size, mtime, bloom) in self.filters.items():
+            bits = base64.b64encode(bloom.bits).decode('ascii')
+            filters[bgl] = [size, mtime, bloom.bit_count, bloom.hash_count, bits]
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w') as bundle_file:
+            json.dump({'version': BUNDLE_VERSION, 'filters': filters}, bundle_file)
+        os.replace(tmp, self.path)
+
+    def update(self, root: Path) -> Tuple[int, int, int]:
+        built = 0
+        kept = 0
+        seen = set()
+        for bgl in iter_bgl_files(root):
+            seen.add(str(bgl))
+            stat = bgl.stat()
+            entry = self.filters.get(str(bgl))
+            if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                kept += 1
+                continue
+            try:
+                with open(bgl, 'rb') as f:
+                    self.filters[str(bgl)] = (stat.st_size, stat.st_mtime_ns, build_ident_filter(f))
+            except Exception as e:
+                print('ERROR: Reading', bgl, 'failed:', repr(e))
+                continue
+            built += 1
+        removed = [bgl for bgl in self.filters if Path(bgl).is_relative_to(root) and bgl not in seen]
+        for bgl in removed:
+            del self.filters[bgl]
+        return built, kept, len(removed)
+
+    def candidates(self, ident: str, section: Section = Section.AIRPORT) -> List[Path]:
+        key = ident_key(section, ident)
+        return [Path(bgl) for bgl, (_, _, bloom) in self.filters.items() if key in bloom]
+
+    def find(self, ident: str, section: Section = Section.AIRPORT) -> List[Path]:
+        found = []
+        for bgl in self.candidates(ident, section):
+            with open(bgl, 'rb') as f:
+                if any(s == section and i == ident for s, i, _, _ in iter_idents(f)):
+                    found.append(bgl)
+        return found
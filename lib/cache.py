@@ -0,0 +1,132 @@
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from .classes import *
+from .parser import *
+
+DEFAULT_BUDGET = 256 * 1024 * 1024
+SAMPLE_SIZE = 16
+
+
+def object_size(obj: Any) -> int:
+    # Sums the sizes of all objects reachable from obj, shared objects are counted once.
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+    return size
+
+
+def estimate_size(bgl: Bgl) -> int:
+    # Walking every record costs more than parsing it, so the size of each record list is extrapolated from a
+    # few evenly spaced records.
+    size = sys.getsizeof(bgl) + sys.getsizeof(bgl.__dict__)
+    for records in (bgl.airports, bgl.ils_vors, bgl.waypoints):
+        size += sys.getsizeof(records)
+        if records:
+            sample = records[::max(1, len(records) // SAMPLE_SIZE)][:SAMPLE_SIZE]
+            size += sum(object_size(record) for record in sample) * len(records) // len(sample)
+    return size
+
+
+class CacheEntry:
+    key: Tuple[int, int]
+    bgl: Bgl
+    size: int
+
+    def __init__(self, key: Tuple[int, int], bgl: Bgl, size: int) -> None:
+        self.key = key
+        self.bgl = bgl
+        self.size = size
+
+
+class BglCache:
+    budget: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    entries: OrderedDict
+
+    def __init__(self, budget: int = DEFAULT_BUDGET) -> None:
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self) -> str:
+        return ('entries=' + str(len(self.entries)) + ' size=' + format(self.size / 1000000, '.1f') + '/'
+                + format(self.budget / 1000000, '.1f') + ' MB hits=' + str(self.hits) + ' misses='
+                + str(self.misses) + ' evictions=' + str(self.evictions))
+
+    @staticmethod
+    def path_key(path: Path) -> str:
+        return str(path.resolve())
+
+    @staticmethod
+    def stat_key(path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: Path, _parse: Callable[[Path], Bgl] = read_bgl) -> Bgl:
+        path_key = self.path_key(path)
+        key = self.stat_key(path)
+        with self._lock:
+            entry = self.entries.get(path_key)
+            if entry is not None and entry.key == key:
+                self.entries.move_to_end(path_key)
+                self.hits += 1
+                return entry.bgl
+            self.misses += 1
+        bgl = _parse(path)
+        self.put(path, bgl, key)
+        return bgl
+
+    def put(self, path: Path, bgl: Bgl, key: Optional[Tuple[int, int]] = None) -> NoReturn:
+        path_key = self.path_key(path)
+        entry = CacheEntry(key or self.stat_key(path), bgl, estimate_size(bgl))
+        with self._lock:
+            self._remove(path_key)
+            if entry.size > self.budget:
+                return
+            self.entries[path_key] = entry
+            self.size += entry.size
+            while self.size > self.budget:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, path: Path) -> NoReturn:
+        with self._lock:
+            self._remove(self.path_key(path))
+
+    def clear(self) -> NoReturn:
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _remove(self, path_key: str) -> NoReturn:
+        entry = self.entries.pop(path_key, None)
+        if entry is not None:
+            self.size -= entry.size
@@ -156,6 +156,8 @@ class Airport(Data):
     name: Optional[Value]
     magvar: Optional[Value]
     ident: Optional[Value]
+    latitude: Optional[Value]
+    longitude: Optional[Value]
     runways: List[Runway]
     departures: List[Procedure]
     arrivals: List[Procedure]
@@ -167,6 +169,8 @@ class Airport(Data):
         self.name = None
         self.magvar = None
         self.ident = None
+        self.latitude = None
+        self.longitude = None
         self.runways = []
         self.departures = []
         self.arrivals = []
@@ -183,6 +187,8 @@ class Airport(Data):
         prnt('Ident', self.ident, indent)
         prnt('Name', self.name, indent)
         prnt('Magvar', self.magvar, indent)
+        prnt('Latitude', self.latitude, indent)
+        prnt('Longitude', self.longitude, indent)
         for runway in self.runways:
             prnt('Runway', runway, indent)
             runway.print(indent+1)
@@ -26,6 +26,18 @@ class Section(Enum):
     WAYPOINT = 0x22
 
 
+IDENT_OFFSETS = {
+    Section.AIRPORT: 0x28,
+    Section.ILS_VOR: 0x20,
+    Section.WAYPOINT: 0x14,
+}
+
+REGION_OFFSETS = {
+    Section.ILS_VOR: 0x24,
+    Section.WAYPOINT: 0x18,
+}
+
+
 class IlsVorType(Enum):
     VOR_TERMINAL = 1
     VOR_LOW = 2
@@ -0,0 +1,93 @@
+import struct
+from array import array
+from typing import Sequence
+
+from .consts import *
+from .parser import *
+
+COORDINATE_OFFSET = 0x08
+
+
+class CoordinateColumns:
+    offsets: Sequence[int]
+    longitudes: Sequence[float]
+    latitudes: Sequence[float]
+
+    def __init__(self, offsets: Sequence[int], longitudes: Sequence[float], latitudes: Sequence[float]) -> None:
+        self.offsets = offsets
+        self.longitudes = longitudes
+        self.latitudes = latitudes
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+def _record_offsets(buf: bytes, record_count: int) -> array:
+    offsets = array('Q')
+    pos = 0
+    for z in range(record_count):
+        offsets.append(pos)
+        pos += struct.unpack_from('<I', buf, pos + 0x02)[0]
+    return offsets
+
+
+def _decode_subsection_numpy(np, buf: bytes, base: int, offsets: array) -> CoordinateColumns:
+    data = np.frombuffer(buf, dtype=np.uint8)
+    starts = np.frombuffer(offsets, dtype=np.uint64).astype(np.int64)
+    packed = data[(starts + COORDINATE_OFFSET)[:, None] + np.arange(8)].copy().view('<u4')
+    longitudes = packed[:, 0] * LONGITUDE_SCALE - 180.0
+    latitudes = 90.0 - packed[:, 1] * LATITUDE_SCALE
+    return CoordinateColumns(starts + base, longitudes, latitudes)
+
+
+def _decode_subsection_array(buf: bytes, base: int, offsets: array) -> CoordinateColumns:
+    raw = array('I')
+    for offset in offsets:
+        raw.extend(struct.unpack_from('<II', buf, offset + COORDINATE_OFFSET))
+    longitudes = array('d', [r * LONGITUDE_SCALE - 180.0 for r in raw[0::2]])
+    latitudes = array('d', [90.0 - r * LATITUDE_SCALE for r in raw[1::2]])
+    return CoordinateColumns(array('Q', [o + base for o in offsets]), longitudes, latitudes)
+
+
+def _empty_columns(np) -> CoordinateColumns:
+    if np is not None:
+        return CoordinateColumns(np.empty(0, np.int64), np.empty(0), np.empty(0))
+    return CoordinateColumns(array('Q'), array('d'), array('d'))
+
+
+def parse_section_coordinates(f: BinaryIO, offset: int) -> CoordinateColumns:
+    np = optional_import('numpy')
+    columns = _empty_columns(np)
+    parts = []
+    for record_count, record_offset, size in parse_subsections(f, offset):
+        buf = read(f, record_offset, size)
+        offsets = _record_offsets(buf, record_count)
+        if np is not None:
+            parts.append(_decode_subsection_numpy(np, buf, record_offset, offsets))
+        else:
+            parts.append(_decode_subsection_array(buf, record_offset, offsets))
+    if np is not None and parts:
+        return CoordinateColumns(np.concatenate([p.offsets for p in parts]),
+                                 np.concatenate([p.longitudes for p in parts]),
+                                 np.concatenate([p.latitudes for p in parts]))
+    for part in parts:
+        columns.offsets.extend(part.offsets)
+        columns.longitudes.extend(part.longitudes)
+        columns.latitudes.extend(part.latitudes)
+    return columns
+
+
+def parse_coordinates(f: BinaryIO, section: Section) -> CoordinateColumns:
+    for section_type, section_offset in iter_section_offsets(f):
+        if section_type == section.value:
+            return parse_section_coordinates(f, section_offset)
+    return _empty_columns(optional_import('numpy'))
+
+
+def parse_bgl_with_coordinates(name: str, f: BinaryIO) -> Tuple[Bgl, dict[Section, CoordinateColumns]]:
+    bgl = parse_bgl(name, f)
+    columns = {}
+    for section_type, section_offset in iter_section_offsets(f):
+        if section_type in (Section.AIRPORT.value, Section.ILS_VOR.value, Section.WAYPOINT.value):
+            columns[Section(section_type)] = parse_section_coordinates(f, section_offset)
+    return bgl, columns
@@ -0,0 +1,152 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+from .consts import *
+from .parser import *
+from .scenery import *
+
+RecordKey = Tuple[Section, str]
+
+
+class RecordHash:
+    offset: int
+    size: int
+    hash: str
+
+    def __init__(self, offset: int, size: int, hash: str) -> None:
+        self.offset = offset
+        self.size = size
+        self.hash = hash
+
+
+class RecordDiff:
+    added: List[RecordKey]
+    removed: List[RecordKey]
+    modified: List[Tuple[RecordKey, List[str]]]
+
+    def __init__(self) -> None:
+        self.added = []
+        self.removed = []
+        self.modified = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def print(self, indent: int = 0) -> NoReturn:
+        for section, ident in self.added:
+            print(('\t' * indent) + '+ ' + section.name + ' ' + ident)
+        for section, ident in self.removed:
+            print(('\t' * indent) + '- ' + section.name + ' ' + ident)
+        for (section, ident), changes in self.modified:
+            print(('\t' * indent) + '~ ' + section.name + ' ' + ident)
+            for change in changes:
+                print(('\t' * (indent + 1)) + change)
+
+
+def record_key(f: BinaryIO, section: Section, ident: str, offset: int) -> RecordKey:
+    region_offset = REGION_OFFSETS.get(section)
+    if region_offset is None:
+        return section, ident
+    region, airport = parse_region_airport(f, offset + region_offset, 4).val
+    return section, '/'.join(part for part in (ident, region.strip(), airport.strip()) if part)
+
+
+def hash_records(f: BinaryIO) -> Dict[RecordKey, RecordHash]:
+    # Idents repeat across regions, so records are keyed by ident, region and airport. Only records that are
+    # identical in all three get an ordinal suffix.
+    records = {}
+    for section, ident, offset, size in iter_idents(f):
+        key = base_key = record_key(f, section, ident, offset)
+        n = 1
+        while key in records:
+            n += 1
+            key = (section, base_key[1] + '#' + str(n))
+        records[key] = RecordHash(offset, size, hashlib.blake2b(read(f, offset, size), digest_size=16).hexdigest())
+    return records
+
+
+def changed_records(label: str, before: List[Any], after: List[Any]) -> List[str]:
+    changes = []
+    for old, new in zip(before, after):
+        if str(old) != str(new):
+            changes.append(label + ': ' + str(old) + ' -> ' + str(new))
+    for old in before[len(after):]:
+        changes.append(label + ': ' + str(old) + ' removed')
+    for new in after[len(before):]:
+        changes.append(label + ': ' + str(new) + ' added')
+    return changes
+
+
+def changed_values(label: str, before: Optional[Value], after: Optional[Value]) -> List[str]:
+    old = Value.pretty(before)
+    new = Value.pretty(after)
+    return [] if old == new else [label + ': ' + old + ' -> ' + new]
+
+
+def describe_airport_changes(before: Airport, after: Airport) -> List[str]:
+    return (changed_values('Name', before.name, after.name)
+            + changed_values('Magvar', before.magvar, after.magvar)
+            + changed_values('Latitude', before.latitude, after.latitude)
+            + changed_values('Longitude', before.longitude, after.longitude)
+            + changed_records('Runway', before.runways, after.runways)
+            + changed_records('Start', before.starts, after.starts)
+            + changed_records('Taxiway Path', before.taxiwayPaths, after.taxiwayPaths)
+            + changed_records('Departure', before.departures, after.departures)
+            + changed_records('Arrival', before.arrivals, after.arrivals))
+
+
+def describe_changes(section: Section, before: Any, after: Any) -> List[str]:
+    if section == Section.AIRPORT:
+        return describe_airport_changes(before, after)
+    changes = (changed_values('Name', getattr(before, 'name', None), getattr(after, 'name', None))
+               + changed_values('Latitude', before.latitude, after.latitude)
+               + changed_values('Longitude', before.longitude, after.longitude))
+    if section == Section.ILS_VOR:
+        changes += changed_values('Magvar', before.magvar, after.magvar)
+        changes += changed_values('Type', before.type, after.type)
+    return changes
+
+
+def diff_records(f_a: BinaryIO, f_b: BinaryIO) -> RecordDiff:
+    diff = RecordDiff()
+    records_a = hash_records(f_a)
+    records_b = hash_records(f_b)
+    for key, entry_a in records_a.items():
+        entry_b = records_b.get(key)
+        if entry_b is None:
+            diff.removed.append(key)
+        elif entry_a.hash != entry_b.hash:
+            _parse = RECORD_PARSERS[key[0]]
+            before = _parse(f_a, entry_a.offset, entry_a.size)
+            after = _parse(f_b, entry_b.offset, entry_b.size)
+            changes = describe_changes(key[0], before, after)
+            diff.modified.append((key, changes or ['Record data changed']))
+    for key in records_b:
+        if key not in records_a:
+            diff.added.append(key)
+    return diff
+
+
+def diff_files(path_a: Path, path_b: Path) -> RecordDiff:
+    with open(path_a, 'rb') as f_a, open(path_b, 'rb') as f_b:
+        return diff_records(f_a, f_b)
+
+
+def diff_trees(root_a: Path, root_b: Path) -> Iterator[Tuple[Path, str, Optional[RecordDiff]]]:
+    files_a = {path.relative_to(root_a) for path in iter_bgl_files(root_a)}
+    files_b = {path.relative_to(root_b) for path in iter_bgl_files(root_b)}
+    for relative in sorted(files_a | files_b):
+        if relative not in files_b:
+            yield relative, 'removed', None
+        elif relative not in files_a:
+            yield relative, 'added', None
+        else:
+            stat_a = os.stat(root_a.joinpath(relative))
+            stat_b = os.stat(root_b.joinpath(relative))
+            if stat_a.st_size == stat_b.st_size and stat_a.st_mtime_ns == stat_b.st_mtime_ns:
+                continue
+            diff = diff_files(root_a.joinpath(relative), root_b.joinpath(relative))
+            if diff:
+                yield relative, 'modified', diff
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from .classes import *
+from .parser import *
+from .scenery import *
+
+BATCH_SIZE = 10000
+
+TABLES = {
+    'airports': [('offset', 'INTEGER'), ('ident', 'TEXT'), ('name', 'TEXT'), ('magvar', 'REAL'),
+                 ('longitude', 'REAL'), ('latitude', 'REAL')],
+    'runways': [('airport_offset', 'INTEGER'), ('offset', 'INTEGER'), ('primary_number', 'TEXT'),
+                ('primary_designator', 'TEXT'), ('secondary_number', 'TEXT'), ('secondary_designator', 'TEXT'),
+                ('heading', 'REAL'), ('primary_ils', 'TEXT'), ('secondary_ils', 'TEXT')],
+    'starts': [('airport_offset', 'INTEGER'), ('offset', 'INTEGER'), ('number', 'TEXT'), ('designator', 'TEXT'),
+               ('type', 'TEXT')],
+    'taxiway_paths': [('airport_offset', 'INTEGER'), ('offset', 'INTEGER'), ('number', 'TEXT'),
+                      ('designator', 'TEXT'), ('type', 'INTEGER')],
+    'procedures': [('airport_offset', 'INTEGER'), ('offset', 'INTEGER'), ('kind', 'TEXT'), ('name', 'TEXT')],
+    'runway_transitions': [('procedure_offset', 'INTEGER'), ('offset', 'INTEGER'), ('number', 'TEXT'),
+                           ('designator', 'TEXT')],
+    'ils_vors': [('offset', 'INTEGER'), ('ident', 'TEXT'), ('name', 'TEXT'), ('type', 'TEXT'), ('region', 'TEXT'),
+                 ('airport', 'TEXT'), ('magvar', 'REAL'), ('longitude', 'REAL'), ('latitude', 'REAL'),
+                 ('localizer_number', 'TEXT'), ('localizer_designator', 'TEXT'), ('localizer_heading', 'REAL')],
+    'waypoints': [('offset', 'INTEGER'), ('ident', 'TEXT'), ('longitude', 'REAL'), ('latitude', 'REAL')],
+}
+
+SQLITE_INDEXES = [
+    ('airports', ['file_id', 'offset']),
+    ('airports', ['ident']),
+    ('runways', ['file_id', 'airport_offset']),
+    ('runways', ['primary_number', 'primary_designator']),
+    ('runways', ['secondary_number', 'secondary_designator']),
+    ('starts', ['file_id', 'airport_offset']),
+    ('taxiway_paths', ['file_id', 'airport_offset']),
+    ('procedures', ['file_id', 'airport_offset']),
+    ('runway_transitions', ['file_id', 'procedure_offset']),
+    ('ils_vors', ['file_id']),
+    ('ils_vors', ['ident']),
+    ('waypoints', ['file_id']),
+    ('waypoints', ['ident']),
+]
+
+
+def _val(value: Optional[Value]) -> Any:
+    return None if value is None else value.val
+
+
+def _display(value: Optional[Value]) -> Optional[str]:
+    return None if value is None else value.display
+
+
+def iter_airport_rows(airport: Airport) -> Iterator[Tuple[str, tuple]]:
+    yield 'airports', (airport.offset, _val(airport.ident), _val(airport.name), _val(airport.magvar),
+                       _val(airport.longitude), _val(airport.latitude))
+    for runway in airport.runways:
+        yield 'runways', (airport.offset, runway.offset, _display(runway.primary_number),
+                          _display(runway.primary_designation), _display(runway.secondary_number),
+                          _display(runway.secondary_designation), _val(runway.heading), _val(runway.primary_ils),
+                          _val(runway.secondary_ils))
+    for start in airport.starts:
+        yield 'starts', (airport.offset, start.offset, _display(start.number), _display(start.designator),
+                         _display(start.type))
+    for taxiway_path in airport.taxiwayPaths:
+        yield 'taxiway_paths', (airport.offset, taxiway_path.offset, _display(taxiway_path.number),
+                                _display(taxiway_path.designator), _val(taxiway_path.type))
+    for kind, procedures in (('departure', airport.departures), ('arrival', airport.arrivals)):
+        for procedure in procedures:
+            yield 'procedures', (airport.offset, procedure.offset, kind, _val(procedure.name))
+            for transition in procedure.runwayTransitions:
+                yield 'runway_transitions', (procedure.offset, transition.offset, _display(transition.number),
+                                             _display(transition.designator))
+
+
+def ils_vor_row(ils_vor: IlsVor) -> Tuple[str, tuple]:
+    region, airport = ils_vor.region_airport.val if ils_vor.region_airport is not None else (None, None)
+    localizer = ils_vor.localizer
+    return 'ils_vors', (ils_vor.offset, _val(ils_vor.ident), _val(ils_vor.name), _display(ils_vor.type), region,
+                        airport, _val(ils_vor.magvar), _val(ils_vor.longitude), _val(ils_vor.latitude),
+                        None if localizer is None else _display(localizer.runway_number),
+                        None if localizer is None else _display(localizer.runway_designator),
+                        None if localizer is None else _val(localizer.heading))
+
+
+def iter_rows(f: BinaryIO) -> Iterator[Tuple[str, tuple]]:
+    for airport in iter_airports(f):
+        yield from iter_airport_rows(airport)
+    for ils_vor in iter_ils_vors(f):
+        yield ils_vor_row(ils_vor)
+    for waypoint in iter_waypoints(f):
+        yield 'waypoints', (waypoint.offset, _val(waypoint.ident), _val(waypoint.longitude),
+                            _val(waypoint.latitude))
+
+
+class Exporter(ABC):
+    @abstractmethod
+    def is_current(self, path: Path, stat: os.stat_result) -> bool:
+        pass
+
+    @abstractmethod
+    def begin_file(self, path: Path, stat: os.stat_result) -> NoReturn:
+        pass
+
+    @abstractmethod
+    def write_rows(self, table: str, rows: List[tuple]) -> NoReturn:
+        pass
+
+    @abstractmethod
+    def end_file(self) -> NoReturn:
+        pass
+
+    @abstractmethod
+    def abort_file(self) -> NoReturn:
+        pass
+
+    @abstractmethod
+    def remove_missing(self, root: Path, seen: set) -> int:
+        pass
+
+    @abstractmethod
+    def close(self) -> NoReturn:
+        pass
+
+    def export_file(self, path: Path) -> bool:
+        stat = path.stat()
+        if self.is_current(path, stat):
+            return False
+        self.begin_file(path, stat)
+        try:
+            batches = {table: [] for table in TABLES}
+            with open(path, 'rb') as f:
+                for table, row in iter_rows(f):
+                    batch = batches[table]
+                    batch.append(row)
+                    if len(batch) >= BATCH_SIZE:
+                        self.write_rows(table, batch)
+                        batches[table] = []
+            for table, batch in batches.items():
+                if batch:
+                    self.write_rows(table, batch)
+        except BaseException:
+            self.abort_file()
+            raise
+        self.end_file()
+        return True
+
+    def export_tree(self, root: Path) -> Tuple[int, int, int, int]:
+        exported = 0
+        skipped = 0
+        failed = 0
+        seen = set()
+        for path in iter_bgl_files(root):
+            seen.add(str(path))
+            try:
+                if self.export_file(path):
+                    exported += 1
+                else:
+                    skipped += 1
+            except Exception as e:
+                print('ERROR: Export of', path, 'failed:', repr(e))
+                failed += 1
+        removed = self.remove_missing(root, seen)
+        return exported, skipped, removed, failed
+
+
+class SqliteExporter(Exporter):
+    def __init__(self, db: Path) -> None:
+        self.conn = sqlite3.connect(db)
+        self.file_id = None
+        self.conn.execute('CREATE TABLE IF NOT EXISTS files '
+                          '(id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime INTEGER)')
+        for table, columns in TABLES.items():
+            self.conn.execute('CREATE TABLE IF NOT EXISTS ' + table + ' (file_id INTEGER, '
+                              + ', '.join(name + ' ' + type for name, type in columns) + ')')
+        for table, columns in SQLITE_INDEXES:
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_' + table + '_' + '_'.join(columns) + ' ON '
+                              + table + ' (' + ', '.join(columns) + ')')
+        self.conn.commit()
+
+    def is_current(self, path: Path, stat: os.stat_result) -> bool:
+        row = self.conn.execute('SELECT size, mtime FROM files WHERE path = ?', (str(path),)).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns
+
+    def _delete_file(self, file_id: int) -> NoReturn:
+        for table in TABLES:
+            self.conn.execute('DELETE FROM ' + table + ' WHERE file_id = ?', (file_id,))
+        self.conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def begin_file(self, path: Path, stat: os.stat_result) -> NoReturn:
+        row = self.conn.execute('SELECT id FROM files WHERE path = ?', (str(path),)).fetchone()
+        if row is not None:
+            self._delete_file(row[0])
+        cursor = self.conn.execute('INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)',
+                                   (str(path), stat.st_size, stat.st_mtime_ns))
+        self.file_id = cursor.lastrowid
+
+    def write_rows(self, table: str, rows: List[tuple]) -> NoReturn:
+        placeholders = ', '.join(['?'] * (len(TABLES[table]) + 1))
+        self.conn.executemany('INSERT INTO ' + table + ' VALUES (' + placeholders + ')',
+                              [(self.file_id,) + row for row in rows])
+
+    def end_file(self) -> NoReturn:
+        self.conn.commit()
+        self.file_id = None
+
+    def abort_file(self) -> NoReturn:
+        self.conn.rollback()
+        self.file_id = None
+
+    def remove_missing(self, root: Path, seen: set) -> int:
+        removed = 0
+        for file_id, path in self.conn.execute('SELECT id, path FROM files').fetchall():
+            if Path(path).is_relative_to(root) and path not in seen:
+                self._delete_file(file_id)
+                removed += 1
+        self.conn.commit()
+        return removed
+
+    def close(self) -> NoReturn:
+        self.conn.close()
+
+
+class ParquetExporter(Exporter):
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, directory: Path) -> None:
+        self.pa = optional_import('pyarrow')
+        self.pq = optional_import('pyarrow.parquet')
+        if self.pa is None or self.pq is None:
+            raise Exception('Parquet export requires pyarrow.')
+        self.directory = directory
+        self.manifest = {}
+        manifest_path = directory.joinpath(self.MANIFEST)
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as manifest_file:
+                self.manifest = json.load(manifest_file)
+        self.schemas = {}
+        for table, columns in TABLES.items():
+            fields = [self.pa.field('file', self.pa.string())]
+            for name, type in columns:
+                if type == 'INTEGER':
+                    fields.append(self.pa.field(name, self.pa.int64()))
+                elif type == 'REAL':
+                    fields.append(self.pa.field(name, self.pa.float64()))
+                else:
+                    fields.append(self.pa.field(name, self.pa.string()))
+            self.schemas[table] = self.pa.schema(fields)
+            os.makedirs(directory.joinpath(table), exist_ok=True)
+        self.path = None
+        self.stat = None
+        self.writers = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return hashlib.sha1(path.encode('utf8')).hexdigest()
+
+    def _table_file(self, table: str, path: str) -> Path:
+        return self.directory.joinpath(table, self._key(path) + '.parquet')
+
+    def _delete_file(self, path: str) -> NoReturn:
+        for table in TABLES:
+            table_file = self._table_file(table, path)
+            if table_file.exists():
+                table_file.unlink()
+        self.manifest.pop(path, None)
+
+    def is_current(self, path: Path, stat: os.stat_result) -> bool:
+        entry = self.manifest.get(str(path))
+        return entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns
+
+    def begin_file(self, path: Path, stat: os.stat_result) -> NoReturn:
+        self._delete_file(str(path))
+        self.path = str(path)
+        self.stat = stat
+
+    def write_rows(self, table: str, rows: List[tuple]) -> NoReturn:
+        writer = self.writers.get(table)
+        if writer is None:
+            writer = self.pq.ParquetWriter(self._table_file(table, self.path), self.schemas[table])
+            self.writers[table] = writer
+        columns = list(zip(*rows))
+        arrays = [self.pa.array([self.path] * len(rows), self.pa.string())]
+        for i, field in enumerate(self.schemas[table]):
+            if i > 0:
+                arrays.append(self.pa.array(columns[i - 1], field.type))
+        writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schemas[table]))
+
+    def end_file(self) -> NoReturn:
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+        self.manifest[self.path] = {'size': self.stat.st_size, 'mtime': self.stat.st_mtime_ns}
+        self.path = None
+        self.stat = None
+        self._write_manifest()
+
+    def abort_file(self) -> NoReturn:
+        for writer in self.writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        self.writers = {}
+        self._delete_file(self.path)
+        self.path = None
+        self.stat = None
+
+    def _write_manifest(self) -> NoReturn:
+        with open(self.directory.joinpath(self.MANIFEST), 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file)
+
+    def remove_missing(self, root: Path, seen: set) -> int:
+        removed = 0
+        for path in list(self.manifest):
+            if Path(path).is_relative_to(root) and path not in seen:
+                self._delete_file(path)
+                removed += 1
+        self._write_manifest()
+        return removed
+
+    def close(self) -> NoReturn:
+        self._write_manifest()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .consts import *
+from .classes import *
+from .parser import *
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.idx.json'
+
+
+class SubsectionEntry:
+    record_count: int
+    record_offset: int
+    size: int
+
+    def __init__(self, record_count: int, record_offset: int, size: int) -> None:
+        self.record_count = record_count
+        self.record_offset = record_offset
+        self.size = size
+
+
+class SectionEntry:
+    type: int
+    offset: int
+    subsections: List[SubsectionEntry]
+
+    def __init__(self, type: int, offset: int) -> None:
+        self.type = type
+        self.offset = offset
+        self.subsections = []
+
+
+class RecordEntry:
+    ident: str
+    offset: int
+    size: int
+
+    def __init__(self, ident: str, offset: int, size: int) -> None:
+        self.ident = ident
+        self.offset = offset
+        self.size = size
+
+
+class BglIndex:
+    file: str
+    size: int
+    mtime: int
+    sections: List[SectionEntry]
+    airports: List[RecordEntry]
+
+    def __init__(self, file: str, size: int, mtime: int) -> None:
+        self.file = file
+        self.size = size
+        self.mtime = mtime
+        self.sections = []
+        self.airports = []
+        self._airports_by_ident = {}
+
+    def add_airport(self, entry: RecordEntry) -> NoReturn:
+        self.airports.append(entry)
+        self._airports_by_ident.setdefault(entry.ident, entry)
+
+    def get_airport(self, ident: str) -> Optional[RecordEntry]:
+        return self._airports_by_ident.get(ident)
+
+    def is_valid_for(self, stat: os.stat_result) -> bool:
+        return self.size == stat.st_size and self.mtime == stat.st_mtime_ns
+
+    def update_stat(self, stat: os.stat_result) -> NoReturn:
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+
+    def to_dict(self) -> dict:
+        return {
+            'version': INDEX_VERSION,
+            'file': self.file,
+            'size': self.size,
+            'mtime': self.mtime,
+            'sections': [{
+                'type': section.type,
+                'offset': section.offset,
+                'subsections': [[s.record_count, s.record_offset, s.size] for s in section.subsections],
+            } for section in self.sections],
+            'airports': [[a.ident, a.offset, a.size] for a in self.airports],
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> Optional[BglIndex]:
+        if data.get('version') != INDEX_VERSION:
+            return None
+        index = BglIndex(data['file'], data['size'], data['mtime'])
+        for s in data['sections']:
+            section = SectionEntry(s['type'], s['offset'])
+            section.subsections = [SubsectionEntry(*sub) for sub in s['subsections']]
+            index.sections.append(section)
+        for a in data['airports']:
+            index.add_airport(RecordEntry(*a))
+        return index
+
+
+def index_path(bgl_path: Path, index_dir: Optional[Path] = None) -> Path:
+    if index_dir is None:
+        return bgl_path.with_name(bgl_path.name + INDEX_SUFFIX)
+    key = hashlib.sha1(str(bgl_path.resolve()).encode('utf8')).hexdigest()
+    return index_dir.joinpath(key + INDEX_SUFFIX)
+
+
+def build_index(name: str, f: BinaryIO) -> BglIndex:
+    stat = os.fstat(f.fileno())
+    index = BglIndex(name, stat.st_size, stat.st_mtime_ns)
+    for section_type, section_offset in iter_section_offsets(f):
+        section = SectionEntry(section_type, section_offset)
+        section.subsections = [SubsectionEntry(*s) for s in parse_subsections(f, section_offset)]
+        index.sections.append(section)
+    for section, ident, record_offset, record_size in iter_idents(f):
+        if section == Section.AIRPORT:
+            index.add_airport(RecordEntry(ident, record_offset, record_size))
+    return index
+
+
+def load_index(bgl_path: Path, index_dir: Optional[Path] = None) -> Optional[BglIndex]:
+    path = index_path(bgl_path, index_dir)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as index_file:
+            index = BglIndex.from_dict(json.load(index_file))
+    except (ValueError, KeyError, TypeError):
+        return None
+    if index is None or not index.is_valid_for(bgl_path.stat()):
+        return None
+    return index
+
+
+def write_index(index: BglIndex, bgl_path: Path, index_dir: Optional[Path] = None) -> NoReturn:
+    path = index_path(bgl_path, index_dir)
+    os.makedirs(path.parent, exist_ok=True)
+    with open(path, 'w') as index_file:
+        json.dump(index.to_dict(), index_file)
+
+
+def get_index(bgl_path: Path, f: BinaryIO, index_dir: Optional[Path] = None, write: bool = True) -> BglIndex:
+    index = load_index(bgl_path, index_dir)
+    if index is None:
+        index = build_index(str(bgl_path), f)
+        if write:
+            write_index(index, bgl_path, index_dir)
+    return index
+
+
+def parse_indexed_airport(f: BinaryIO, index: BglIndex, ident: str) -> Optional[Airport]:
+    entry = index.get_airport(ident)
+    if entry is None:
+        return None
+    return parse_airport(f, entry.offset, entry.size)
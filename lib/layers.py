@@ -0,0 +1,132 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+OFFICIAL_DIR = 'Official'
+COMMUNITY_DIR = 'Community'
+CONTENT_FILE = 'Content.xml'
+LAYERS = [OFFICIAL_DIR, COMMUNITY_DIR]
+
+
+class Package:
+    name: str
+    path: Path
+    layer: str
+    active: bool
+
+    def __init__(self, name: str, path: Path, layer: str, active: bool = True) -> None:
+        self.name = name
+        self.path = path
+        self.layer = layer
+        self.active = active
+
+    def __str__(self) -> str:
+        return self.layer + '/' + self.name + ('' if self.active else ' (inactive)')
+
+    def layout_files(self) -> Optional[List[str]]:
+        layout = self.path.joinpath('layout.json')
+        if not layout.exists():
+            return None
+        with open(layout, 'r', encoding='utf8') as layout_file:
+            content = json.load(layout_file).get('content', [])
+        return [entry['path'] for entry in content if entry.get('path', '').lower().endswith('.bgl')]
+
+
+def is_package(path: Path) -> bool:
+    return path.is_dir() and path.joinpath('manifest.json').exists()
+
+
+def iter_packages(root: Path) -> Iterator[Package]:
+    official = root.joinpath(OFFICIAL_DIR)
+    if official.is_dir():
+        # Official packages are grouped by store (OneStore, Steam).
+        for path in sorted(official.iterdir()):
+            if is_package(path):
+                yield Package(path.name, path, OFFICIAL_DIR)
+            elif path.is_dir():
+                for package_path in sorted(path.iterdir()):
+                    if is_package(package_path):
+                        yield Package(package_path.name, package_path, OFFICIAL_DIR)
+    community = root.joinpath(COMMUNITY_DIR)
+    if community.is_dir():
+        for path in sorted(community.iterdir()):
+            if is_package(path):
+                yield Package(path.name, path, COMMUNITY_DIR)
+
+
+def read_content_order(root: Path) -> Optional[Dict[str, bool]]:
+    for content_file in (root.joinpath(CONTENT_FILE), root.parent.joinpath(CONTENT_FILE)):
+        if content_file.exists():
+            import xml.etree.ElementTree as ElementTree
+            order = {}
+            for element in ElementTree.parse(content_file).getroot().iter('Package'):
+                order[element.get('name')] = element.get('active', 'true').lower() == 'true'
+            return order
+    return None
+
+
+class LayerResolver:
+    root: Path
+    packages: List[Package]
+    _package_paths: Dict[Path, int]
+    _layouts: Dict[int, Optional[set]]
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        packages = list(iter_packages(root))
+        order = read_content_order(root)
+        if order is not None:
+            positions = {name: position for position, name in enumerate(order)}
+            for package in packages:
+                package.active = order.get(package.name, True)
+            packages.sort(key=lambda package: (LAYERS.index(package.layer),
+                                               positions.get(package.name, len(positions)), package.name))
+        self.packages = packages
+        self._package_paths = {}
+        self._layouts = {}
+        for rank, package in enumerate(packages):
+            self._package_paths[package.path.absolute()] = rank
+            self._package_paths[package.path.resolve()] = rank
+
+    def locate(self, bgl: Path) -> Optional[Tuple[int, Path]]:
+        for path in (bgl.absolute(), bgl.resolve()):
+            for parent in path.parents:
+                rank = self._package_paths.get(parent)
+                if rank is not None:
+                    return rank, path.relative_to(parent)
+        return None
+
+    def rank(self, bgl: Path) -> Optional[int]:
+        location = self.locate(bgl)
+        return None if location is None else location[0]
+
+    def package_of(self, bgl: Path) -> Optional[Package]:
+        rank = self.rank(bgl)
+        return None if rank is None else self.packages[rank]
+
+    def is_loaded(self, bgl: Path) -> bool:
+        location = self.locate(bgl)
+        if location is None:
+            return False
+        rank, relative = location
+        if not self.packages[rank].active:
+            return False
+        if rank not in self._layouts:
+            layout_files = self.packages[rank].layout_files()
+            self._layouts[rank] = None if layout_files is None else {path.lower() for path in layout_files}
+        layout = self._layouts[rank]
+        return layout is None or relative.as_posix().lower() in layout
+
+    def effective(self, bgl_files: Iterable[Path]) -> Optional[Path]:
+        # Packages loaded later override earlier ones, files of inactive packages or missing in the
+        # package layout are never loaded.
+        ranked = [(self.rank(bgl), str(bgl), bgl) for bgl in bgl_files if self.is_loaded(bgl)]
+        return max(ranked)[2] if ranked else None
+
+
+def same_file(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return a.absolute() == b.absolute()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+from typing import Dict
+
+from .util import *
+
+
+class PatchOverlay:
+    file: BinaryIO
+    base: mmap.mmap
+    patches: Dict[int, int]
+    position: int
+
+    def __init__(self, f: BinaryIO) -> None:
+        self.file = f
+        self.base = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.patches = {}
+        self._offsets = []
+        self.position = 0
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += len(self.base)
+        self.position = offset
+        return self.position
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def tell(self) -> int:
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        start = self.position
+        end = len(self.base) if size < 0 else min(start + size, len(self.base))
+        data = self.base[start:end]
+        first = bisect.bisect_left(self._offsets, start)
+        last = bisect.bisect_left(self._offsets, end)
+        if first < last:
+            data = bytearray(data)
+            for offset in self._offsets[first:last]:
+                data[offset - start] = self.patches[offset]
+            data = bytes(data)
+        self.position = start + len(data)
+        return data
+
+    def write(self, data: bytes) -> int:
+        if self.position + len(data) > len(self.base):
+            raise Exception('Write beyond end of file at ' + format(self.position, 'x').upper())
+        for i, b in enumerate(data):
+            offset = self.position + i
+            if offset not in self.patches:
+                bisect.insort(self._offsets, offset)
+            self.patches[offset] = b
+        self.position += len(data)
+        return len(data)
+
+    def original(self, offset: int, size: int) -> bytes:
+        return self.base[offset:offset + size]
+
+    def close(self) -> NoReturn:
+        self.base.close()
+
+    def __enter__(self) -> PatchOverlay:
+        return self
+
+    def __exit__(self, *args) -> NoReturn:
+        self.close()
@@ -0,0 +1,86 @@
+import mmap
+import os
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from .consts import *
+from .classes import *
+from .parser import *
+
+SECTION_ATTRIBUTES = {
+    Section.AIRPORT: 'airports',
+    Section.ILS_VOR: 'ils_vors',
+    Section.WAYPOINT: 'waypoints',
+}
+
+_executor = None
+
+
+class MappedFile:
+    data: mmap.mmap
+    position: int
+
+    def __init__(self, data: mmap.mmap) -> None:
+        self.data = data
+        self.position = 0
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += len(self.data)
+        self.position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.data) if size < 0 else self.position + size
+        data = self.data[self.position:end]
+        self.position += len(data)
+        return data
+
+
+def free_threaded() -> bool:
+    return not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def default_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor()
+    return _executor
+
+
+def parse_section_parallel(data: mmap.mmap, offset: int, _parse_record: Callable,
+                           executor: Executor) -> List[Any]:
+    subsections = parse_subsections(MappedFile(data), offset)
+    if len(subsections) < 2:
+        return parse_section(MappedFile(data), offset, _parse_record)
+    results = executor.map(lambda subsection:
+                           parse_subsection(MappedFile(data), subsection[0], subsection[1], _parse_record),
+                           subsections)
+    return [record for records in results for record in records]
+
+
+def parse_bgl_parallel(path: Path, executor: Optional[Executor] = None) -> Bgl:
+    # Records are Python objects, so only threads on free-threaded Python can build them in parallel. Worker
+    # processes would spend more time pickling the records back than parsing them, with the GIL the file is
+    # parsed serially instead.
+    if executor is None and not free_threaded():
+        return read_bgl(path)
+    executor = executor or default_executor()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        view = MappedFile(data)
+        bgl = Bgl(str(path))
+        bgl.header_size = read_int(view, 0x04, 4)
+        bgl.section_count = read_int(view, 0x14, 4)
+        for section_type, section_offset in iter_section_offsets(view):
+            for section, attribute in SECTION_ATTRIBUTES.items():
+                if section_type == section.value:
+                    setattr(bgl, attribute, parse_section_parallel(data, section_offset, RECORD_PARSERS[section],
+                                                                   executor))
+    return bgl
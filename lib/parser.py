@@ -1,4 +1,5 @@
-from typing import Callable
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
 
 from .consts import *
 from .classes import *
@@ -34,14 +35,14 @@ def parse_ident(file: BinaryIO, offset: int, size: int, shift: bool = True) -> V
 
 def parse_longitude(file: BinaryIO, offset: int, size: int) -> Value:
     value = parse_int(file, offset, size)
-    value.val = (value.val * (360.0 / (3 * 0x10000000))) - 180.0
+    value.val = decode_longitude(value.val)
     value.display = str(value.val)
     return value
 
 
 def parse_latitude(file: BinaryIO, offset: int, size: int) -> Value:
     value = parse_int(file, offset, size)
-    value.val = 90.0 - (value.val * (180.0 / (2 * 0x10000000)))
+    value.val = decode_latitude(value.val)
     value.display = str(value.val)
     return value
 
@@ -160,6 +161,8 @@ def parse_start(f: BinaryIO, offset: int, size: int) -> Start:
 def parse_airport(f: BinaryIO, offset: int, size: int) -> Airport:
     airport = Airport(offset, size)
     airport.runways = []
+    airport.longitude = parse_longitude(f, offset + 0x08, 4)
+    airport.latitude = parse_latitude(f, offset + 0x0C, 4)
     airport.magvar = parse_float(f, offset + 0x24, 4)
     airport.ident = parse_ident(f, offset + 0x28, 4)
     subrecord_end = size + offset
@@ -282,8 +285,15 @@ def parse_waypoint(f: BinaryIO, offset: int, size: int) -> Waypoint:
     return waypoint
 
 
-def parse_section(f: BinaryIO, offset: int, _parse_record: Callable) -> List[Any]:
-    records = []
+RECORD_PARSERS = {
+    Section.AIRPORT: parse_airport,
+    Section.ILS_VOR: parse_ils_vor,
+    Section.WAYPOINT: parse_waypoint,
+}
+
+
+def parse_subsections(f: BinaryIO, offset: int) -> List[Tuple[int, int, int]]:
+    subsections = []
     sub_section_size = ((read_int(f, offset + 0x04, 4) & 0x10000) | 0x40000) >> 0x0E
     subsection_count = read_int(f, offset + 0x08, 4)
     first_subsection_offset = read_int(f, offset + 0x0C, 4)
@@ -291,20 +301,76 @@ def parse_section(f: BinaryIO, offset: int, _parse_record: Callable) -> List[Any
         subsection_offset = first_subsection_offset + (y * sub_section_size)
         record_count = read_int(f, subsection_offset + 0x04, 4)
         record_offset = read_int(f, subsection_offset + 0x08, 4)
-        for z in range(record_count):
-            record_size = read_int(f, record_offset + 0x02, 4)
-            records.append(_parse_record(f, record_offset, record_size))
-            record_offset += record_size
-    return records
+        size = read_int(f, subsection_offset + 0x0C, 4)
+        subsections.append((record_count, record_offset, size))
+    return subsections
+
+
+def iter_subsection_offsets(f: BinaryIO, record_count: int, record_offset: int) -> Iterator[Tuple[int, int]]:
+    for z in range(record_count):
+        record_size = read_int(f, record_offset + 0x02, 4)
+        yield record_offset, record_size
+        record_offset += record_size
+
+
+def parse_subsection(f: BinaryIO, record_count: int, record_offset: int, _parse_record: Callable) -> List[Any]:
+    return [_parse_record(f, offset, size) for offset, size in iter_subsection_offsets(f, record_count, record_offset)]
+
+
+def iter_record_offsets(f: BinaryIO, offset: int) -> Iterator[Tuple[int, int]]:
+    for record_count, record_offset, _ in parse_subsections(f, offset):
+        yield from iter_subsection_offsets(f, record_count, record_offset)
+
+
+def iter_section(f: BinaryIO, offset: int, _parse_record: Callable) -> Iterator[Any]:
+    for record_offset, record_size in iter_record_offsets(f, offset):
+        yield _parse_record(f, record_offset, record_size)
+
+
+def parse_section(f: BinaryIO, offset: int, _parse_record: Callable) -> List[Any]:
+    return list(iter_section(f, offset, _parse_record))
+
+
+def iter_section_offsets(f: BinaryIO) -> Iterator[Tuple[int, int]]:
+    header_size = read_int(f, 0x04, 4)
+    section_count = read_int(f, 0x14, 4)
+    for x in range(section_count):
+        section_offset = header_size + (x * 0x14)
+        yield read_int(f, section_offset, 4), section_offset
+
+
+def iter_records(f: BinaryIO, section: Section, _parse_record: Callable) -> Iterator[Any]:
+    for section_type, section_offset in iter_section_offsets(f):
+        if section_type == section.value:
+            yield from iter_section(f, section_offset, _parse_record)
+
+
+def iter_airports(f: BinaryIO) -> Iterator[Airport]:
+    return iter_records(f, Section.AIRPORT, parse_airport)
+
+
+def iter_ils_vors(f: BinaryIO) -> Iterator[IlsVor]:
+    return iter_records(f, Section.ILS_VOR, parse_ils_vor)
+
+
+def iter_waypoints(f: BinaryIO) -> Iterator[Waypoint]:
+    return iter_records(f, Section.WAYPOINT, parse_waypoint)
+
+
+def iter_idents(f: BinaryIO) -> Iterator[Tuple[Section, str, int, int]]:
+    for section_type, section_offset in iter_section_offsets(f):
+        for section, ident_offset in IDENT_OFFSETS.items():
+            if section_type == section.value:
+                for record_offset, record_size in iter_record_offsets(f, section_offset):
+                    ident = decode_ident(read_int(f, record_offset + ident_offset, 4))
+                    yield section, ident, record_offset, record_size
 
 
 def parse_bgl(name: str, f: BinaryIO) -> Bgl:
     bgl = Bgl(name)
     bgl.header_size = read_int(f, 0x04, 4)
     bgl.section_count = read_int(f, 0x14, 4)
-    for x in range(bgl.section_count):
-        section_offset = bgl.header_size + (x * 0x14)
-        section_type = read_int(f, section_offset, 4)
+    for section_type, section_offset in iter_section_offsets(f):
         if section_type == Section.AIRPORT.value:
             bgl.airports = parse_section(f, section_offset, parse_airport)
         elif section_type == Section.ILS_VOR.value:
@@ -312,3 +378,8 @@ def parse_bgl(name: str, f: BinaryIO) -> Bgl:
         elif section_type == Section.WAYPOINT.value:
             bgl.waypoints = parse_section(f, section_offset, parse_waypoint)
     return bgl
+
+
+def read_bgl(path: Path) -> Bgl:
+    with open(path, 'rb') as f:
+        return parse_bgl(str(path), f)
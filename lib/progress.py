@@ -0,0 +1,164 @@
+import os
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from .util import *
+
+METRICS_PREFIX = 'rename_runways_'
+
+
+class StageMetrics:
+    seconds: float
+    bytes: int
+    records: int
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.bytes = 0
+        self.records = 0
+
+    def mb_per_second(self) -> float:
+        return self.bytes / 1000000 / self.seconds if self.seconds > 0 else 0.0
+
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+
+class Progress:
+    total_files: int
+    total_bytes: int
+    files: int
+    bytes: int
+    records: int
+    patches: int
+    stages: Dict[str, StageMetrics]
+
+    def __init__(self, total_files: int, total_bytes: int, show: bool = True, metrics_file: Optional[Path] = None,
+                 stream: TextIO = sys.stderr, interval: float = 0.5) -> None:
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.show = show
+        self.metrics_file = metrics_file
+        self.stream = stream
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.records = 0
+        self.patches = 0
+        self.stages = {}
+        self.started = time.perf_counter()
+        self._rendered = 0.0
+        self._line_length = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def stage(self, name: str, size: int = 0) -> Iterator[StageMetrics]:
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics())
+        started = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            with self._lock:
+                metrics.seconds += time.perf_counter() - started
+                metrics.bytes += size
+
+    def count(self, name: str, size: int = 0, records: int = 0) -> NoReturn:
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics())
+            metrics.bytes += size
+            metrics.records += records
+
+    def file_done(self, size: int, records: int = 0, patches: int = 0) -> NoReturn:
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.records += records
+            self.patches += patches
+            self.update()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def eta(self) -> Optional[float]:
+        elapsed = self.elapsed()
+        if self.bytes == 0 or elapsed <= 0:
+            return None
+        return (self.total_bytes - self.bytes) / (self.bytes / elapsed)
+
+    def status(self) -> str:
+        elapsed = self.elapsed()
+        line = (str(self.files) + '/' + str(self.total_files) + ' files | '
+                + format(self.bytes / 1000000, '.1f') + '/' + format(self.total_bytes / 1000000, '.1f') + ' MB | '
+                + str(self.records) + ' rec | ' + str(self.patches) + ' patches')
+        if elapsed > 0:
+            line += ' | ' + format(self.bytes / 1000000 / elapsed, '.1f') + ' MB/s'
+        for name, metrics in self.stages.items():
+            line += ' | ' + name
+            if metrics.bytes:
+                line += ' ' + format(metrics.mb_per_second(), '.1f') + ' MB/s'
+            if metrics.records:
+                line += ' ' + format(metrics.records_per_second(), '.0f') + ' rec/s'
+        eta = self.eta()
+        if eta is not None:
+            line += ' | ETA ' + format(eta, '.0f') + 's'
+        return line[:shutil.get_terminal_size().columns - 1]
+
+    def clear(self) -> NoReturn:
+        with self._lock:
+            if self.show and self._line_length:
+                self.stream.write('\r' + ' ' * self._line_length + '\r')
+                self.stream.flush()
+                self._line_length = 0
+
+    def render(self) -> NoReturn:
+        with self._lock:
+            if self.show:
+                line = self.status()
+                self.stream.write('\r' + line.ljust(self._line_length))
+                self.stream.flush()
+                self._line_length = len(line)
+            if self.metrics_file is not None:
+                self.write_metrics()
+            self._rendered = time.perf_counter()
+
+    def update(self) -> NoReturn:
+        if time.perf_counter() - self._rendered >= self.interval or self.files == self.total_files:
+            self.render()
+
+    def finish(self) -> NoReturn:
+        self.render()
+        if self.show:
+            self.stream.write('\n')
+            self.stream.flush()
+            self._line_length = 0
+
+    def metrics(self) -> List[str]:
+        lines = [
+            METRICS_PREFIX + 'files_total ' + str(self.total_files),
+            METRICS_PREFIX + 'files_processed ' + str(self.files),
+            METRICS_PREFIX + 'bytes_total ' + str(self.total_bytes),
+            METRICS_PREFIX + 'bytes_processed ' + str(self.bytes),
+            METRICS_PREFIX + 'records_parsed ' + str(self.records),
+            METRICS_PREFIX + 'patches_written ' + str(self.patches),
+            METRICS_PREFIX + 'elapsed_seconds ' + format(self.elapsed(), '.3f'),
+        ]
+        eta = self.eta()
+        if eta is not None:
+            lines.append(METRICS_PREFIX + 'eta_seconds ' + format(eta, '.3f'))
+        for name, metrics in self.stages.items():
+            lines.append(METRICS_PREFIX + 'stage_seconds{stage="' + name + '"} ' + format(metrics.seconds, '.3f'))
+            lines.append(METRICS_PREFIX + 'stage_bytes{stage="' + name + '"} ' + str(metrics.bytes))
+            lines.append(METRICS_PREFIX + 'stage_records{stage="' + name + '"} ' + str(metrics.records))
+        return lines
+
+    def write_metrics(self) -> NoReturn:
+        tmp = self.metrics_file.with_name(self.metrics_file.name + '.tmp')
+        with open(tmp, 'w') as metrics_file:
+            metrics_file.write('\n'.join(self.metrics()) + '\n')
+        os.replace(tmp, self.metrics_file)
@@ -0,0 +1,465 @@
+from __future__ import annotations
+
+import csv
+import os
+import shutil
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, TextIO, Tuple
+
+from .consts import *
+from .classes import *
+from .parser import *
+from .state import *
+from .progress import *
+
+
+class RunwayChange:
+    bgl: Path
+    airport: str
+    oldRunwayNumber: str
+    oldRunwayDesignator: str
+    newRunwayNumber: str
+    newRunwayDesignator: str
+    rowHash: str
+
+    def __init__(self, bgl: Path, airport: str, old_runway_number: str, old_runway_designator: str,
+                 new_runway_number: str, new_runway_designator: str, row_hash: str = '') -> None:
+        self.bgl = bgl
+        self.airport = airport
+        self.oldRunwayNumber = old_runway_number
+        self.oldRunwayDesignator = old_runway_designator
+        self.newRunwayNumber = new_runway_number
+        self.newRunwayDesignator = new_runway_designator
+        self.rowHash = row_hash
+
+
+designators = ['L', 'R', 'C', 'W', 'A', 'B']
+special_numbers = ['n', 'ne', 'e', 'se', 's', 'sw', 'n', 'w', 'nw']
+
+
+def split_number_and_designator(value: str):
+    number = value.strip()
+    designator = ''
+    if number[-1] in designators:
+        designator = number[-1]
+        number = number[:-1]
+    if number.isnumeric():
+        n = int(number)
+        if 1 <= n <= 36:
+            return number, designator
+    if number in special_numbers:
+        return number, designator
+    raise Exception('Invalid runway number:', value)
+
+
+def get_airport(bgl: Bgl, ident: str) -> Optional[Airport]:
+    for airport in bgl.airports:
+        if airport.ident.val == ident:
+            return airport
+    return None
+
+
+def write_patch(f: BinaryIO, offset: int, new_bytes: bytes, patches: List[Patch]):
+    f.seek(offset)
+    f.write(new_bytes)
+    patches.append((offset, new_bytes))
+
+
+def do_change(f: BinaryIO, airport: Airport, change: RunwayChange, out: Optional[TextIO] = None) -> List[Patch]:
+    msg = ('Update ' + airport.ident.val + ' [' + change.oldRunwayNumber + change.oldRunwayDesignator + '] -> [' +
+           change.newRunwayNumber + change.newRunwayDesignator + ']\t-- ')
+
+    patches = []
+    runway_updates = 0
+    start_updates = 0
+    taxiway_updates = 0
+    for runway in airport.runways:
+        if (runway.primary_number.display == change.oldRunwayNumber
+                and runway.primary_designation.display == change.oldRunwayDesignator):
+            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), runway.primary_number.size)
+            write_patch(f, runway.primary_number.offset, new_bytes, patches)
+            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator),
+                                 runway.primary_designation.size)
+            write_patch(f, runway.primary_designation.offset, new_bytes, patches)
+            runway_updates += 1
+
+        if (runway.secondary_number.display == change.oldRunwayNumber
+                and runway.secondary_designation.display == change.oldRunwayDesignator):
+            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), runway.secondary_number.size)
+            write_patch(f, runway.secondary_number.offset, new_bytes, patches)
+            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator),
+                                 runway.secondary_designation.size)
+            write_patch(f, runway.secondary_designation.offset, new_bytes, patches)
+            runway_updates += 1
+
+    for start in airport.starts:
+        if (start.type.val == StartType.RUNWAY.value and start.number.display == change.oldRunwayNumber
+                and start.designator.display == change.oldRunwayDesignator):
+            if start.designator.size != 1:
+                raise Exception(start)
+
+            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), start.number.size)
+            write_patch(f, start.number.offset, new_bytes, patches)
+
+            f.seek(start.designator.offset)
+            old_bytes = f.read(start.designator.size)
+            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator), start.designator.size)
+            combined = from_int(((old_bytes[0] >> 4) << 4) + new_bytes[0], start.designator.size)
+            write_patch(f, start.designator.offset, combined, patches)
+            start_updates += 1
+
+    for taxiway_path in airport.taxiwayPaths:
+        if (taxiway_path.type.val == 2 and taxiway_path.number.display == change.oldRunwayNumber
+                and taxiway_path.designator.display == change.oldRunwayDesignator):
+            if taxiway_path.designator.size != 1:
+                raise Exception(taxiway_path)
+
+            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), taxiway_path.number.size)
+            write_patch(f, taxiway_path.number.offset, new_bytes, patches)
+
+            f.seek(taxiway_path.designator.offset)
+            old_bytes = f.read(taxiway_path.designator.size)
+            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator),
+                                 taxiway_path.designator.size)
+            combined = from_int((old_bytes[0] & 0b00001111) + (new_bytes[0] << 4), taxiway_path.designator.size)
+            write_patch(f, taxiway_path.designator.offset, combined, patches)
+            taxiway_updates += 1
+
+    if runway_updates == 0 and start_updates == 0 and taxiway_updates == 0:
+        msg += 'Runway [' + change.oldRunwayNumber + change.oldRunwayDesignator + '] not found!'
+    else:
+        msg += 'runways=' + str(runway_updates) + ' starts=' + str(start_updates) + ' taxiways=' + str(taxiway_updates)
+    print(msg, file=out)
+    return patches
+
+
+class RenameOptions:
+    test_mode: bool
+    backup_dir: Optional[Path]
+    use_index: bool
+    index_dir: Optional[Path]
+    state_file: Optional[Path]
+    filter_bundle: Path
+    progress: bool
+    metrics_file: Optional[Path]
+    watch_interval_min: float
+    watch_interval_max: float
+    parallel_parse: bool
+    resolve_layers: bool
+    cache: Any
+
+    def __init__(self, test_mode: bool = False, backup_dir: Optional[Path] = None, use_index: bool = False,
+                 index_dir: Optional[Path] = None, state_file: Optional[Path] = None,
+                 filter_bundle: Path = Path('ident_filters.json'), progress: bool = False,
+                 metrics_file: Optional[Path] = None, watch_interval_min: float = 2.0,
+                 watch_interval_max: float = 60.0, parallel_parse: bool = False,
+                 resolve_layers: bool = False, cache: Any = None) -> None:
+        self.test_mode = test_mode
+        self.backup_dir = backup_dir
+        self.use_index = use_index or index_dir is not None
+        self.index_dir = index_dir
+        self.state_file = state_file
+        self.filter_bundle = filter_bundle
+        self.progress = progress
+        self.metrics_file = metrics_file
+        self.watch_interval_min = watch_interval_min
+        self.watch_interval_max = watch_interval_max
+        self.parallel_parse = parallel_parse
+        self.resolve_layers = resolve_layers
+        self.cache = cache
+
+
+class FileResult:
+    bgl: Path
+    status: str
+    records: int
+    patches: int
+
+    def __init__(self, bgl: Path, status: str, records: int = 0, patches: int = 0) -> None:
+        self.bgl = bgl
+        self.status = status
+        self.records = records
+        self.patches = patches
+
+    def __str__(self) -> str:
+        return str(self.bgl) + ': ' + self.status + ' records=' + str(self.records) + ' patches=' + str(self.patches)
+
+
+def print_overlay_comparison(bgl_file: Path, overlay: Any, airports: List[Airport],
+                             out: Optional[TextIO] = None):
+    from .diff import describe_airport_changes
+    print('Patched bytes in memory:', len(overlay.patches), file=out)
+    try:
+        parse_bgl(str(bgl_file), overlay)
+    except Exception as e:
+        print('ERROR: Patched BGL does not parse:', repr(e), file=out)
+        return
+    for airport in airports:
+        patched = parse_airport(overlay, airport.offset, airport.size)
+        print('Patched ' + airport.ident.val + ':', file=out)
+        for change in describe_airport_changes(airport, patched):
+            print('\t' + change, file=out)
+
+
+def load_filter_bundle(root: Optional[Path], options: RenameOptions) -> Any:
+    from .bloom import FilterBundle
+    if root is None or not root.exists():
+        raise Exception('MSFS root not found, cannot look up BGL files of airports.')
+    print('Updating ident filters of', root)
+    bundle = FilterBundle(options.filter_bundle)
+    built, kept, removed = bundle.update(root)
+    print('built=' + str(built) + ' unchanged=' + str(kept) + ' removed=' + str(removed))
+    bundle.save()
+    return bundle
+
+
+def resolve_layers(changes: Iterable[RunwayChange], root: Optional[Path], options: RenameOptions,
+                   bundle: Any = None) -> List[RunwayChange]:
+    from .layers import LayerResolver, same_file
+    if root is None or not root.exists():
+        raise Exception('MSFS root not found, cannot resolve content layers.')
+    resolver = LayerResolver(root)
+    print('Content layers:', len(resolver.packages), 'packages')
+    suppliers = {}
+    effective_changes = []
+    for change in changes:
+        if resolver.package_of(change.bgl) is None:
+            effective_changes.append(change)
+            continue
+        if change.airport not in suppliers:
+            if bundle is None:
+                bundle = load_filter_bundle(root, options)
+            suppliers[change.airport] = resolver.effective(bundle.find(change.airport))
+        supplier = suppliers[change.airport]
+        if supplier is not None and same_file(supplier, change.bgl):
+            effective_changes.append(change)
+        elif not resolver.is_loaded(change.bgl):
+            print('WARN: BGL is not loaded by the sim (' + str(resolver.package_of(change.bgl)) + '), skipped:',
+                  change.bgl)
+        elif supplier is None:
+            print('WARN: Airport', change.airport, 'is not loaded from any package, skipped:', change.bgl)
+        else:
+            print('WARN: Airport', change.airport, 'in', change.bgl, 'is overridden by', supplier,
+                  '(' + str(resolver.package_of(supplier)) + '), skipped.')
+    return effective_changes
+
+
+def read_changes(csv_file: Path, root: Optional[Path], options: Optional[RenameOptions] = None) -> List[RunwayChange]:
+    options = options or RenameOptions()
+    runway_changes = []
+    bundle = None
+    with open(csv_file, 'r') as csvFile:
+        reader = csv.reader(csvFile, delimiter=';')
+        rows = [row for row in reader]
+        for row in rows:
+            if len(row) == 4:
+                old_number, old_designator = split_number_and_designator(row[2])
+                new_number, new_designator = split_number_and_designator(row[3])
+                if is_blank(row[0]):
+                    if bundle is None:
+                        bundle = load_filter_bundle(root, options)
+                    bgl_files = bundle.find(row[1])
+                    if not bgl_files:
+                        print('WARN: No BGL file found for airport', row[1])
+                else:
+                    bgl_files = [Path(row[0].replace('<msfs>', str(root)))]
+                for bgl_file in bgl_files:
+                    runway_changes.append(RunwayChange(bgl_file, row[1], old_number, old_designator, new_number,
+                                                       new_designator, hash_row(row)))
+            else:
+                raise Exception('Malformed row:', row)
+    if options.resolve_layers:
+        runway_changes = resolve_layers(runway_changes, root, options, bundle)
+    return runway_changes
+
+
+def group_changes(changes: Iterable[RunwayChange]) -> Dict[Path, Dict[str, List[RunwayChange]]]:
+    runway_changes = defaultdict(lambda: defaultdict(list))
+    for change in changes:
+        runway_changes[change.bgl][change.airport].append(change)
+    return runway_changes
+
+
+def backup_bgl(bgl_file: Path, root: Optional[Path], options: RenameOptions):
+    if root is None or options.backup_dir is None or options.test_mode:
+        return
+    if root.exists() and bgl_file.is_relative_to(root):
+        bak = options.backup_dir.joinpath(bgl_file.relative_to(root))
+        if not bak.exists():
+            os.makedirs(bak.parent, exist_ok=True)
+            shutil.copyfile(bgl_file, bak)
+
+
+def process_bgl(bgl_file: Path, airport_changes: Dict[str, List[RunwayChange]], root: Optional[Path],
+                options: RenameOptions, state: Optional[RunState], progress: Progress,
+                out: Optional[TextIO] = None) -> FileResult:
+    progress.clear()
+    print(bgl_file, file=out)
+    if not bgl_file.exists():
+        print('WARN: File not found:', bgl_file, file=out)
+        progress.file_done(0)
+        return FileResult(bgl_file, 'missing')
+    size = bgl_file.stat().st_size
+    row_hashes = [change.rowHash for changes in airport_changes.values() for change in changes]
+    with progress.stage('check'):
+        applied = {} if state is None else state.applied_rows(bgl_file)
+    if all(row_hash in applied for row_hash in row_hashes):
+        print('All changes already applied, skipped.', file=out)
+        if state is not None and state.dirty and not options.test_mode:
+            state.save()
+        progress.file_done(size)
+        return FileResult(bgl_file, 'skipped')
+    backup_bgl(bgl_file, root, options)
+    mode = 'rb+'
+    if options.test_mode:
+        mode = 'rb'
+    row_patches = {row_hash: applied.get(row_hash, []) for row_hash in row_hashes}
+    changed_airports = []
+    records = 0
+    patches = 0
+    with open(bgl_file, mode) as bgl_f:
+        if options.test_mode:
+            from .overlay import PatchOverlay
+            f = PatchOverlay(bgl_f)
+        else:
+            f = bgl_f
+        if options.use_index:
+            from .index import get_index, parse_indexed_airport, write_index
+            with progress.stage('parse'):
+                index = get_index(bgl_file, f, options.index_dir, not options.test_mode)
+        else:
+            with progress.stage('parse', size):
+                if options.cache is None and not options.parallel_parse:
+                    bgl = parse_bgl(str(bgl_file), f)
+                else:
+                    if options.parallel_parse:
+                        from .parallel import parse_bgl_parallel
+                        _parse = parse_bgl_parallel
+                    else:
+                        _parse = read_bgl
+                    bgl = _parse(bgl_file) if options.cache is None else options.cache.get(bgl_file, _parse)
+                records = len(bgl.airports) + len(bgl.ils_vors) + len(bgl.waypoints)
+                progress.count('parse', records=records)
+        for change_airport in airport_changes:
+            changes = [change for change in airport_changes[change_airport] if change.rowHash not in applied]
+            if not changes:
+                continue
+            if options.use_index:
+                entry = index.get_airport(change_airport)
+                with progress.stage('parse', 0 if entry is None else entry.size):
+                    airport = parse_indexed_airport(f, index, change_airport)
+                    if airport is not None:
+                        records += 1
+                        progress.count('parse', records=1)
+            else:
+                airport = get_airport(bgl, change_airport)
+            if airport is None:
+                print('WARN: Airport', change_airport, 'not in BGL file.', file=out)
+                continue
+            with progress.stage('patch'):
+                for change in changes:
+                    change_patches = do_change(f, airport, change, out)
+                    row_patches[change.rowHash].extend(change_patches)
+                    progress.count('patch', sum(len(new_bytes) for _, new_bytes in change_patches),
+                                   len(change_patches))
+                    patches += len(change_patches)
+            changed_airports.append(airport)
+        if options.test_mode:
+            print_overlay_comparison(bgl_file, f, changed_airports, out)
+            f.close()
+    if options.cache is not None and patches and not options.test_mode:
+        options.cache.invalidate(bgl_file)
+    if options.use_index and not options.test_mode:
+        index.update_stat(bgl_file.stat())
+        write_index(index, bgl_file, options.index_dir)
+    if state is not None and not options.test_mode:
+        state.record(bgl_file, row_patches)
+        state.save()
+    progress.file_done(size, records, patches)
+    return FileResult(bgl_file, 'tested' if options.test_mode else 'applied', records, patches)
+
+
+def stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def check_root(root: Optional[Path], options: RenameOptions):
+    if root is not None and root.exists() and options.backup_dir is not None:
+        if options.backup_dir.absolute().is_relative_to(root.absolute()):
+            raise Exception('Backup directory must not be inside MSFS root.')
+
+
+def prepare_run(changes: Iterable[RunwayChange], root: Optional[Path], options: RenameOptions,
+                progress: Optional[Progress] = None) \
+        -> Tuple[Dict[Path, Dict[str, List[RunwayChange]]], Optional[RunState], Progress]:
+    check_root(root, options)
+    state = None if options.state_file is None else RunState(options.state_file)
+    runway_changes = group_changes(changes)
+    if progress is None:
+        total_bytes = sum(key[0] for key in map(stat_key, runway_changes) if key is not None)
+        progress = Progress(len(runway_changes), total_bytes, options.progress, options.metrics_file)
+    return runway_changes, state, progress
+
+
+def iter_apply_changes(changes: Iterable[RunwayChange], root: Optional[Path] = None,
+                       options: Optional[RenameOptions] = None,
+                       progress: Optional[Progress] = None) -> Iterator[FileResult]:
+    options = options or RenameOptions()
+    runway_changes, state, progress = prepare_run(changes, root, options, progress)
+    for bgl_file in runway_changes:
+        yield process_bgl(bgl_file, runway_changes[bgl_file], root, options, state, progress)
+    progress.finish()
+
+
+def apply_changes(changes: Iterable[RunwayChange], root: Optional[Path] = None,
+                  options: Optional[RenameOptions] = None) -> List[FileResult]:
+    return list(iter_apply_changes(changes, root, options))
+
+
+def watch_changes(changes: Iterable[RunwayChange], root: Optional[Path] = None,
+                  options: Optional[RenameOptions] = None) -> NoReturn:
+    options = options or RenameOptions()
+    check_root(root, options)
+    state = None if options.state_file is None else RunState(options.state_file)
+    runway_changes = group_changes(changes)
+    progress = Progress(0, 0, options.progress, options.metrics_file)
+    print('Watching', len(runway_changes), 'BGL files for changes. Press Ctrl+C to stop.')
+    known = {bgl_file: stat_key(bgl_file) for bgl_file in runway_changes}
+    pending = {}
+    interval = options.watch_interval_min
+    try:
+        while True:
+            time.sleep(interval)
+            changed = False
+            for bgl_file in runway_changes:
+                key = stat_key(bgl_file)
+                if key == known[bgl_file]:
+                    pending.pop(bgl_file, None)
+                    continue
+                changed = True
+                if key is None or pending.get(bgl_file) != key:
+                    pending[bgl_file] = key
+                    continue
+                del pending[bgl_file]
+                print('Changed:', bgl_file)
+                progress.total_files += 1
+                progress.total_bytes += key[0]
+                try:
+                    process_bgl(bgl_file, runway_changes[bgl_file], root, options, state, progress)
+                except Exception as e:
+                    # The file may still be written or locked by the sim or an updater, retry on the next poll.
+                    progress.clear()
+                    print('ERROR: Processing', bgl_file, 'failed, retrying:', repr(e))
+                    pending[bgl_file] = key
+                    continue
+                progress.finish()
+                known[bgl_file] = stat_key(bgl_file)
+            interval = options.watch_interval_min if changed else min(interval * 2, options.watch_interval_max)
+    except KeyboardInterrupt:
+        print('Watch stopped.')
@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+from typing import Callable, Iterator, Tuple, Any
+
+BGL_SUFFIX = '.bgl'
+
+
+def iter_bgl_files(root: Path) -> Iterator[Path]:
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(BGL_SUFFIX):
+                yield Path(directory, filename)
+
+
+def iter_scenery(root: Path, _iter_records: Callable) -> Iterator[Tuple[Path, Any]]:
+    for path in iter_bgl_files(root):
+        with open(path, 'rb') as f:
+            for record in _iter_records(f):
+                yield path, record
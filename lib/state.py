@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .util import *
+
+STATE_VERSION = 1
+
+Patch = Tuple[int, bytes]
+
+
+def hash_row(row: List[str]) -> str:
+    return hashlib.sha256(';'.join(col.strip() for col in row).encode('utf8')).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def patches_in_place(f: BinaryIO, patches: List[Patch]) -> bool:
+    if not patches:
+        return False
+    for offset, new_bytes in patches:
+        if read(f, offset, len(new_bytes)) != new_bytes:
+            return False
+    return True
+
+
+class RunState:
+    path: Path
+    files: Dict[str, dict]
+    dirty: bool
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.files = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path, 'r') as state_file:
+                data = json.load(state_file)
+            if data.get('version') == STATE_VERSION:
+                self.files = data['files']
+
+    def save(self) -> NoReturn:
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with self._lock:
+            with open(tmp, 'w') as state_file:
+                json.dump({'version': STATE_VERSION, 'files': self.files}, state_file)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def applied_rows(self, bgl: Path) -> Dict[str, List[Patch]]:
+        entry = self.files.get(str(bgl))
+        if entry is None:
+            return {}
+        stat = bgl.stat()
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime']:
+            if hash_file(bgl) != entry['hash']:
+                return {}
+            entry['size'] = stat.st_size
+            entry['mtime'] = stat.st_mtime_ns
+            # The file was only touched, the refreshed entry has to be saved or every run hashes it again.
+            self.dirty = True
+        applied = {}
+        with open(bgl, 'rb') as f:
+            for row_hash, patches in entry['rows'].items():
+                patches = [(offset, bytes.fromhex(new_bytes)) for offset, new_bytes in patches]
+                if patches_in_place(f, patches):
+                    applied[row_hash] = patches
+        return applied
+
+    def record(self, bgl: Path, rows: Dict[str, List[Patch]]) -> NoReturn:
+        stat = bgl.stat()
+        entry = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'hash': hash_file(bgl),
+            'rows': {row_hash: [[offset, new_bytes.hex()] for offset, new_bytes in patches]
+                     for row_hash, patches in rows.items() if patches},
+        }
+        with self._lock:
+            self.files[str(bgl)] = entry
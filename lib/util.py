@@ -1,7 +1,15 @@
+import importlib
 import struct
 from typing import BinaryIO, Any, NoReturn
 
 
+def optional_import(name: str) -> Any:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
 def is_blank(val: str) -> bool:
     return not (val and val.strip())
 
@@ -28,6 +36,18 @@ def decode_ident(ident_value: int, shift: bool = True) -> str:
     return res
 
 
+LONGITUDE_SCALE = 360.0 / (3 * 0x10000000)
+LATITUDE_SCALE = 180.0 / (2 * 0x10000000)
+
+
+def decode_longitude(raw: int) -> float:
+    return (raw * LONGITUDE_SCALE) - 180.0
+
+
+def decode_latitude(raw: int) -> float:
+    return 90.0 - (raw * LATITUDE_SCALE)
+
+
 def runway_number_to_int(number: str) -> int:
     if number == 'n':
         return 37
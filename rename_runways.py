@@ -1,209 +1,84 @@
 from __future__ import annotations
-import csv
-import os.path
-import shutil
+import argparse
 import sys
-from collections import defaultdict
 from pathlib import Path
-
-from lib import *
+from typing import List, Optional
 
 MSFS_ROOT = Path('G:/MSFS/Microsoft Flight Simulator')
 BACKUP_DIR = Path('backup')
 TEST_MODE = False
-
-sys.argv.pop(0)
-while sys.argv:
-    arg = sys.argv.pop(0)
-    if arg == '-x':
-        TEST_MODE = True
-    elif arg == '-r':
-        MSFS_ROOT = Path(sys.argv.pop(0))
-    elif arg == '-b':
-        b = sys.argv.pop(0)
-        if b == '':
-            BACKUP_DIR = None
-        else:
-            BACKUP_DIR = Path(sys.argv.pop(0))
-    else:
-        raise Exception('Unknown arg ' + arg)
-
-
-class RunwayChange:
-    bgl: Path
-    airport: str
-    oldRunwayNumber: str
-    oldRunwayDesignator: str
-    newRunwayNumber: str
-    newRunwayDesignator: str
-
-    def __init__(self, bgl: Path, airport: str, old_runway_number: str, old_runway_designator: str,
-                 new_runway_number: str, new_runway_designator: str) -> None:
-        self.bgl = bgl
-        self.airport = airport
-        self.oldRunwayNumber = old_runway_number
-        self.oldRunwayDesignator = old_runway_designator
-        self.newRunwayNumber = new_runway_number
-        self.newRunwayDesignator = new_runway_designator
-
-
-designators = ['L', 'R', 'C', 'W', 'A', 'B']
-special_numbers = ['n', 'ne', 'e', 'se', 's', 'sw', 'n', 'w', 'nw']
-
-
-def split_number_and_designator(value: str):
-    number = value.strip()
-    designator = ''
-    if number[-1] in designators:
-        designator = number[-1]
-        number = number[:-1]
-    if number.isnumeric():
-        n = int(number)
-        if 1 <= n <= 36:
-            return number, designator
-    if number in special_numbers:
-        return number, designator
-    raise Exception('Invalid runway number:', value)
-
-
-def get_airport(bgl: Bgl, ident: str) -> Optional[Airport]:
-    for airport in bgl.airports:
-        if airport.ident.val == ident:
-            return airport
-    return None
-
-
-def do_change(f: BinaryIO, airport: Airport, change: RunwayChange):
-    msg = ('Update ' + airport.ident.val + ' [' + change.oldRunwayNumber + change.oldRunwayDesignator + '] -> [' +
-           change.newRunwayNumber + change.newRunwayDesignator + ']\t-- ')
-
-    runway_updates = 0
-    start_updates = 0
-    taxiway_updates = 0
-    for runway in airport.runways:
-        if (runway.primary_number.display == change.oldRunwayNumber
-                and runway.primary_designation.display == change.oldRunwayDesignator):
-            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), runway.primary_number.size)
-            f.seek(runway.primary_number.offset)
-            if not TEST_MODE:
-                f.write(new_bytes)
-            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator),
-                                 runway.primary_designation.size)
-            f.seek(runway.primary_designation.offset)
-            if not TEST_MODE:
-                f.write(new_bytes)
-            runway_updates += 1
-
-        if (runway.secondary_number.display == change.oldRunwayNumber
-                and runway.secondary_designation.display == change.oldRunwayDesignator):
-            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), runway.secondary_number.size)
-            f.seek(runway.secondary_number.offset)
-            if not TEST_MODE:
-                f.write(new_bytes)
-            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator),
-                                 runway.secondary_designation.size)
-            f.seek(runway.secondary_designation.offset)
-            if not TEST_MODE:
-                f.write(new_bytes)
-            runway_updates += 1
-
-    for start in airport.starts:
-        if (start.type.val == StartType.RUNWAY.value and start.number.display == change.oldRunwayNumber
-                and start.designator.display == change.oldRunwayDesignator):
-            if start.designator.size != 1:
-                raise Exception(start)
-
-            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), start.number.size)
-            f.seek(start.number.offset)
-            if not TEST_MODE:
-                f.write(new_bytes)
-
-            f.seek(start.designator.offset)
-            old_bytes = f.read(start.designator.size)
-            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator), start.designator.size)
-            combined = from_int(((old_bytes[0] >> 4) << 4) + new_bytes[0], start.designator.size)
-            f.seek(start.designator.offset)
-            if not TEST_MODE:
-                f.write(combined)
-            start_updates += 1
-
-    for taxiway_path in airport.taxiwayPaths:
-        if (taxiway_path.type.val == 2 and taxiway_path.number.display == change.oldRunwayNumber
-                and taxiway_path.designator.display == change.oldRunwayDesignator):
-            if taxiway_path.designator.size != 1:
-                raise Exception(taxiway_path)
-
-            new_bytes = from_int(runway_number_to_int(change.newRunwayNumber), taxiway_path.number.size)
-            f.seek(taxiway_path.number.offset)
-            if not TEST_MODE:
-                f.write(new_bytes)
-
-            f.seek(taxiway_path.designator.offset)
-            old_bytes = f.read(taxiway_path.designator.size)
-            new_bytes = from_int(runway_designator_to_int(change.newRunwayDesignator),
-                                 taxiway_path.designator.size)
-            combined = from_int((old_bytes[0] & 0b00001111) + (new_bytes[0] << 4), taxiway_path.designator.size)
-            f.seek(taxiway_path.designator.offset)
-            if not TEST_MODE:
-                f.write(combined)
-            taxiway_updates += 1
-
-    if runway_updates == 0 and start_updates == 0 and taxiway_updates == 0:
-        msg += 'Runway [' + change.oldRunwayNumber + change.oldRunwayDesignator + '] not found!'
-    else:
-        msg += 'runways=' + str(runway_updates) + ' starts=' + str(start_updates) + ' taxiways=' + str(taxiway_updates)
-    print(msg)
-
-
-def main():
-    if TEST_MODE:
+USE_INDEX = False
+INDEX_DIR = None
+STATE_FILE = Path('rename_state.json')
+FILTER_BUNDLE = Path('ident_filters.json')
+WATCH = False
+WATCH_INTERVAL_MIN = 2.0
+WATCH_INTERVAL_MAX = 60.0
+PROGRESS = None
+METRICS_FILE = None
+PARALLEL_PARSE = False
+RESOLVE_LAYERS = False
+CHANGES_FILE = Path('runways.csv')
+
+
+def optional_path(value: str) -> Optional[Path]:
+    return None if value == '' else Path(value)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Changes runway numbers directly in MSFS 2020 BGL files.')
+    parser.add_argument('-x', dest='test_mode', action='store_true', default=TEST_MODE,
+                        help='only output details, apply the changes to an in-memory copy of the BGLs')
+    parser.add_argument('-r', dest='msfs_root', type=Path, default=MSFS_ROOT,
+                        help='root path of the MSFS data folder')
+    parser.add_argument('-b', dest='backup_dir', type=optional_path, default=BACKUP_DIR,
+                        help='backup directory for BGLs inside the MSFS data folder, "" to disable')
+    parser.add_argument('-c', dest='changes_file', type=Path, default=CHANGES_FILE,
+                        help='runway changes file (default runways.csv)')
+    parser.add_argument('-i', dest='use_index', action='store_true', default=USE_INDEX,
+                        help='use a table-of-contents index next to each BGL')
+    parser.add_argument('-I', dest='index_dir', type=Path, default=INDEX_DIR,
+                        help='use table-of-contents indexes stored in this directory')
+    parser.add_argument('-s', dest='state_file', type=optional_path, default=STATE_FILE,
+                        help='state file of applied changes, "" to disable')
+    parser.add_argument('-f', dest='filter_bundle', type=Path, default=FILTER_BUNDLE,
+                        help='ident filter bundle used for rows without BGL path')
+    parser.add_argument('-w', dest='watch', action='store_true', default=WATCH,
+                        help='keep running and re-apply changes when BGLs are replaced')
+    parser.add_argument('-p', '--progress', dest='progress', action=argparse.BooleanOptionalAction,
+                        default=PROGRESS, help='show a progress status line (default when running in a terminal)')
+    parser.add_argument('-m', dest='metrics_file', type=Path, default=METRICS_FILE,
+                        help='write progress metrics in Prometheus text format to this file')
+    parser.add_argument('-P', dest='parallel_parse', action='store_true', default=PARALLEL_PARSE,
+                        help='parse the subsections of each BGL in parallel')
+    parser.add_argument('-l', dest='resolve_layers', action='store_true', default=RESOLVE_LAYERS,
+                        help='only patch the BGLs that supply each airport according to the content layers')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    from lib.rename import RenameOptions, apply_changes, read_changes, watch_changes
+
+    if args.test_mode:
         print('!! TEST MODE !!')
-    if not MSFS_ROOT.exists():
+    if not args.msfs_root.exists():
         if input('MSFS root not found, backup disabled. Continue? (y)') != 'y':
             return
-    else:
-        if BACKUP_DIR is None:
-            print('Backup disabled.')
-        elif BACKUP_DIR.is_relative_to(MSFS_ROOT):
-            raise Exception('Backup directory must not be inside MSFS root.')
-
-    runway_changes: dict[Path, dict[str, list[RunwayChange]]] = defaultdict(lambda: defaultdict(list))
-    with open('runways.csv', 'r') as csvFile:
-        reader = csv.reader(csvFile, delimiter=';')
-        rows = [row for row in reader]
-        for row in rows:
-            if len(row) == 4:
-                old_number, old_designator = split_number_and_designator(row[2])
-                new_number, new_designator = split_number_and_designator(row[3])
-                runway_change = RunwayChange(Path(row[0].replace('<msfs>', str(MSFS_ROOT))), row[1], old_number,
-                                             old_designator, new_number, new_designator)
-                runway_changes[runway_change.bgl][runway_change.airport].append(runway_change)
-            else:
-                raise Exception('Malformed row:', row)
-
-    for bgl_file in runway_changes:
-        print(bgl_file)
-        if not bgl_file.exists():
-            print('WARN: File not found:', bgl_file)
-            continue
-        if MSFS_ROOT.exists() and BACKUP_DIR is not None and bgl_file.is_relative_to(MSFS_ROOT):
-            bak = BACKUP_DIR.joinpath(bgl_file.relative_to(MSFS_ROOT))
-            if not TEST_MODE and not bak.exists():
-                os.makedirs(bak.parent, exist_ok=True)
-                shutil.copyfile(bgl_file, bak)
-        mode = 'rb+'
-        if TEST_MODE:
-            mode = 'rb'
-        with open(bgl_file, mode) as f:
-            bgl = parse_bgl(str(bgl_file), f)
-            for change_airport in runway_changes[bgl_file]:
-                airport = get_airport(bgl, change_airport)
-                if airport is None:
-                    print('WARN: Airport', change_airport, 'not in BGL file.')
-                    continue
-                changes = runway_changes[bgl_file][change_airport]
-                for change in changes:
-                    do_change(f, airport, change)
+    elif args.backup_dir is None:
+        print('Backup disabled.')
+
+    options = RenameOptions(test_mode=args.test_mode, backup_dir=args.backup_dir, use_index=args.use_index,
+                            index_dir=args.index_dir, state_file=args.state_file, filter_bundle=args.filter_bundle,
+                            progress=sys.stderr.isatty() if args.progress is None else args.progress,
+                            metrics_file=args.metrics_file, watch_interval_min=WATCH_INTERVAL_MIN,
+                            watch_interval_max=WATCH_INTERVAL_MAX, parallel_parse=args.parallel_parse,
+                            resolve_layers=args.resolve_layers)
+    changes = read_changes(args.changes_file, args.msfs_root, options)
+    apply_changes(changes, args.msfs_root, options)
+    if args.watch:
+        watch_changes(changes, args.msfs_root, options)
 
 
 if __name__ == "__main__":
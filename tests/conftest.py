@@ -0,0 +1,12 @@
+from pathlib import Path
+
+import pytest
+
+from .synthetic import sample_bgl
+
+
+@pytest.fixture
+def bgl_file(tmp_path: Path) -> Path:
+    path = tmp_path.joinpath('scenery.bgl')
+    path.write_bytes(sample_bgl())
+    return path
@@ -0,0 +1,109 @@
+import struct
+from pathlib import Path
+
+
+def encode_ident(ident: str, shift: bool = True) -> int:
+    value = 0
+    for char in ident:
+        if char == ' ':
+            digit = 0
+        elif char.isdigit():
+            digit = ord(char) - 46
+        else:
+            digit = ord(char) - 53
+        value = value * 38 + digit
+    return value << 5 if shift else value
+
+
+def pack_coordinates(record: bytearray, longitude: float, latitude: float) -> None:
+    struct.pack_into('<II', record, 0x08, int((longitude + 180) / (360.0 / (3 * 0x10000000))),
+                     int((90 - latitude) / (180.0 / (2 * 0x10000000))))
+
+
+def runway(number: int, designator: int, secondary_number: int, secondary_designator: int,
+           heading: float) -> bytes:
+    record = bytearray(0x34)
+    struct.pack_into('<HI', record, 0, 0xce, len(record))
+    record[8:12] = bytes([number, designator, secondary_number, secondary_designator])
+    struct.pack_into('<f', record, 0x28, heading)
+    return bytes(record)
+
+
+def start(number: int, designator: int) -> bytes:
+    record = bytearray(0x18)
+    struct.pack_into('<HI', record, 0, 0x11, len(record))
+    record[6] = number
+    record[7] = (1 << 4) | designator
+    return bytes(record)
+
+
+def name(text: str) -> bytes:
+    record = bytearray(6) + text.encode() + b'\0'
+    struct.pack_into('<HI', record, 0, 0x19, len(record))
+    return bytes(record)
+
+
+def airport(ident: str, magvar: float, runways: list, longitude: float = 10.0, latitude: float = 50.0) -> bytes:
+    subrecords = name(ident + ' Intl')
+    for number, designator, secondary_number, secondary_designator, heading in runways:
+        subrecords += runway(number, designator, secondary_number, secondary_designator, heading)
+        subrecords += start(number, designator) + start(secondary_number, secondary_designator)
+    record = bytearray(0x44)
+    struct.pack_into('<HI', record, 0, 0x56, len(record) + len(subrecords))
+    pack_coordinates(record, longitude, latitude)
+    struct.pack_into('<f', record, 0x24, magvar)
+    struct.pack_into('<I', record, 0x28, encode_ident(ident))
+    return bytes(record) + subrecords
+
+
+def waypoint(ident: str, region: str, longitude: float, latitude: float) -> bytes:
+    record = bytearray(0x1C)
+    struct.pack_into('<HI', record, 0, 0x22, len(record))
+    pack_coordinates(record, longitude, latitude)
+    struct.pack_into('<I', record, 0x14, encode_ident(ident))
+    struct.pack_into('<I', record, 0x18, encode_ident(region, shift=False))
+    return bytes(record)
+
+
+def build_bgl(sections: list) -> bytes:
+    header_size = 0x38
+    data = bytearray(header_size + 0x14 * len(sections))
+    struct.pack_into('<I', data, 0x04, header_size)
+    struct.pack_into('<I', data, 0x14, len(sections))
+    for x, (section_type, subsections) in enumerate(sections):
+        subsection_offset = len(data)
+        data += bytearray(0x10 * len(subsections))
+        struct.pack_into('<IIII', data, header_size + x * 0x14, section_type, 0, len(subsections),
+                         subsection_offset)
+        for y, records in enumerate(subsections):
+            record_offset = len(data)
+            data += b''.join(records)
+            struct.pack_into('<IIII', data, subsection_offset + y * 0x10, 0, len(records), record_offset,
+                             len(data) - record_offset)
+    return bytes(data)
+
+
+def sample_bgl(waypoints: list = None) -> bytes:
+    if waypoints is None:
+        waypoints = [waypoint('ABC' + str(n), 'K2', n * 0.5, 40 + n * 0.1) for n in range(10)]
+    return build_bgl([
+        (0x03, [[airport('KTUS', -10.0, [(3, 0, 21, 0, 33.0), (11, 1, 29, 2, 121.0)])],
+                [airport('ENSB', -5.0, [(10, 0, 28, 0, 105.0)], longitude=15.0, latitude=78.0)]]),
+        (0x22, [waypoints]),
+    ])
+
+
+def broken_bgl() -> bytes:
+    # A start with an unknown type makes StartType(...) raise while parsing the airport.
+    data = bytearray(sample_bgl())
+    offset = data.index(start(3, 0))
+    data[offset + 7] = 0xF0
+    return bytes(data)
+
+
+def write_tree(tmp_path: Path) -> Path:
+    root = tmp_path.joinpath('Official')
+    root.mkdir()
+    root.joinpath('good.bgl').write_bytes(sample_bgl())
+    root.joinpath('bad.bgl').write_bytes(broken_bgl())
+    return root
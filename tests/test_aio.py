@@ -0,0 +1,25 @@
+import asyncio
+
+from lib.aio import apply_changes_async
+from lib.rename import RenameOptions, read_changes
+
+from .synthetic import sample_bgl
+
+
+def test_output_of_each_file_is_one_block(tmp_path, capsys):
+    rows = []
+    for n in range(8):
+        path = tmp_path.joinpath(str(n) + '.bgl')
+        path.write_bytes(sample_bgl())
+        rows += [str(path) + ';KTUS;03;04', str(path) + ';KTUS;11L;12L', str(path) + ';ENSB;28;27']
+    csv_file = tmp_path.joinpath('runways.csv')
+    csv_file.write_text('\n'.join(rows) + '\n')
+    options = RenameOptions()
+    changes = read_changes(csv_file, None, options)
+    results = asyncio.run(apply_changes_async(changes, None, options, max_open=4))
+    assert sorted(result.status for result in results) == ['applied'] * 8
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 8 * 4
+    for block in range(8):
+        assert lines[block * 4].endswith('.bgl')
+        assert all(line.startswith('Update ') for line in lines[block * 4 + 1:block * 4 + 4])
@@ -0,0 +1,42 @@
+import pytest
+
+import lib.analysis
+from lib.analysis import find_runway_renumbers, magnetic_headings, runway_number_deviations, runway_numbers
+
+from .synthetic import write_tree
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(lib.analysis, 'optional_import', lambda name: None)
+    return request.param
+
+
+def test_magnetic_headings_wrap(backend):
+    assert list(magnetic_headings([350.0, 10.0, 90.0], [20.0, -20.0, 0.0])) == [10.0, 350.0, 90.0]
+
+
+def test_runway_numbers_round_to_nearest_ten(backend):
+    magnetic = [0.0, 4.9, 5.0, 180.0, 354.9, 355.0, 359.9]
+    assert [int(n) for n in runway_numbers(magnetic)] == [36, 36, 1, 18, 35, 36, 36]
+
+
+def test_runway_number_deviations_wrap(backend):
+    deviations = runway_number_deviations([355.0, 5.0, 181.0, 23.0], [1, 36, 18, 3])
+    assert [round(float(d), 6) for d in deviations] == [15.0, 5.0, 1.0, 7.0]
+
+
+def test_renumbers_beyond_tolerance(tmp_path, bgl_file, backend):
+    renumbers = sorted(str(renumber) for renumber in find_runway_renumbers(tmp_path))
+    assert renumbers == ['KTUS 03 -> 02 (magnetic heading 23.0)', 'KTUS 21 -> 20 (magnetic heading 203.0)']
+    assert list(find_runway_renumbers(tmp_path, tolerance=2.0)) == []
+
+
+def test_scan_continues_after_failed_file(tmp_path, capsys):
+    root = write_tree(tmp_path)
+    renumbers = list(find_runway_renumbers(root))
+    assert {renumber.end.bgl.name for renumber in renumbers} <= {'good.bgl'}
+    assert 'bad.bgl' in capsys.readouterr().out
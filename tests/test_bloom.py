@@ -0,0 +1,22 @@
+from lib.bloom import BloomFilter, FilterBundle, ident_key
+from lib.consts import Section
+
+
+def test_no_false_negatives():
+    keys = ['WAYPOINT:W' + str(n) for n in range(5000)]
+    bloom = BloomFilter.for_capacity(len(keys))
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert sum('AIRPORT:X' + str(n) in bloom for n in range(5000)) < 5000 * 0.05
+
+
+def test_filter_survives_save_and_load(tmp_path, bgl_file):
+    bundle = FilterBundle(tmp_path.joinpath('filters.json'))
+    assert bundle.update(tmp_path) == (1, 0, 0)
+    bundle.save()
+    loaded = FilterBundle(tmp_path.joinpath('filters.json'))
+    for section, ident in [(Section.AIRPORT, 'KTUS'), (Section.AIRPORT, 'ENSB'), (Section.WAYPOINT, 'ABC3')]:
+        assert ident_key(section, ident) in loaded.filters[str(bgl_file)][2]
+    assert loaded.find('KTUS') == [bgl_file]
+    assert loaded.find('ZZZZ') == []
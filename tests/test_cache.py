@@ -0,0 +1,85 @@
+import os
+import time
+
+from lib.cache import BglCache, estimate_size, object_size
+from lib.parser import read_bgl
+from lib.rename import RenameOptions, apply_changes, read_changes
+
+from .synthetic import build_bgl, sample_bgl, waypoint
+
+
+def write_bgls(tmp_path, count):
+    paths = []
+    for n in range(count):
+        path = tmp_path.joinpath(str(n) + '.bgl')
+        path.write_bytes(sample_bgl())
+        paths.append(path)
+    return paths
+
+
+def test_hit_returns_same_model(bgl_file):
+    cache = BglCache()
+    assert cache.get(bgl_file) is cache.get(bgl_file)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    first, second, third = write_bgls(tmp_path, 3)
+    cache = BglCache(budget=estimate_size(read_bgl(first)) * 2 + 1000)
+    cache.get(first)
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+    assert [os.path.basename(path) for path in cache.entries] == ['0.bgl', '2.bgl']
+    assert cache.evictions == 1
+    assert cache.size <= cache.budget
+
+
+def test_entry_larger_than_budget_is_not_cached(bgl_file):
+    cache = BglCache(budget=100)
+    cache.get(bgl_file)
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_changed_file_is_parsed_again(bgl_file):
+    cache = BglCache()
+    before = cache.get(bgl_file)
+    bgl_file.write_bytes(bgl_file.read_bytes() + b'\0')
+    assert cache.get(bgl_file) is not before
+
+
+def test_patched_file_is_invalidated(tmp_path, bgl_file):
+    cache = BglCache()
+    before = cache.get(bgl_file)
+    csv_file = tmp_path.joinpath('runways.csv')
+    csv_file.write_text(str(bgl_file) + ';KTUS;03;04\n')
+    options = RenameOptions(cache=cache)
+    apply_changes(read_changes(csv_file, None, options), None, options)
+    assert len(cache) == 0
+    after = cache.get(bgl_file)
+    assert after is not before
+    assert after.airports[0].runways[0].primary_number.val == 4
+
+
+def best_time(func, *args) -> float:
+    times = []
+    for _ in range(3):
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def test_miss_costs_little_more_than_a_parse(tmp_path):
+    path = tmp_path.joinpath('navdata.bgl')
+    path.write_bytes(build_bgl([(0x22, [[waypoint(str(x * 1000 + y).zfill(5), 'K2', y * 0.01, x * 0.01)
+                                         for y in range(1000)] for x in range(20)])]))
+    parse = best_time(read_bgl, path)
+    miss = best_time(lambda: BglCache().get(path))
+    assert miss < parse * 1.5
+
+
+def test_estimate_is_close_to_full_walk(tmp_path):
+    bgl = read_bgl(write_bgls(tmp_path, 1)[0])
+    assert 0.5 < estimate_size(bgl) / object_size(bgl) < 2
@@ -0,0 +1,16 @@
+from lib.diff import diff_files
+
+from .synthetic import build_bgl, waypoint
+
+
+def test_inserted_duplicate_ident_only_adds_one_record(tmp_path):
+    before = [waypoint('ABC', 'K1', 1.0, 40.0), waypoint('ABC', 'K2', 2.0, 41.0), waypoint('ABC', 'K3', 3.0, 42.0)]
+    after = [waypoint('ABC', 'K0', 0.5, 39.0)] + before
+    old = tmp_path.joinpath('old.bgl')
+    new = tmp_path.joinpath('new.bgl')
+    old.write_bytes(build_bgl([(0x22, [before])]))
+    new.write_bytes(build_bgl([(0x22, [after])]))
+    diff = diff_files(old, new)
+    assert [ident for _, ident in diff.added] == ['ABC/K0']
+    assert not diff.removed
+    assert not diff.modified
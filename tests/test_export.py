@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+from lib.export import ParquetExporter, SqliteExporter
+
+from .synthetic import sample_bgl, write_tree
+
+
+def test_sqlite_export_continues_after_failed_file(tmp_path):
+    root = write_tree(tmp_path)
+    exporter = SqliteExporter(tmp_path.joinpath('scenery.sqlite'))
+    assert exporter.export_tree(root) == (1, 0, 0, 1)
+    paths = [row[0] for row in exporter.conn.execute('SELECT path FROM files')]
+    assert paths == [str(root.joinpath('good.bgl'))]
+    root.joinpath('bad.bgl').write_bytes(sample_bgl())
+    assert exporter.export_tree(root) == (1, 1, 0, 0)
+    exporter.close()
+
+
+def test_sqlite_export_keeps_sibling_directories(tmp_path):
+    for name in ('Official', 'Official2'):
+        tmp_path.joinpath(name).mkdir()
+        tmp_path.joinpath(name, 'a.bgl').write_bytes(sample_bgl())
+    exporter = SqliteExporter(tmp_path.joinpath('scenery.sqlite'))
+    exporter.export_tree(tmp_path.joinpath('Official2'))
+    assert exporter.export_tree(tmp_path.joinpath('Official')) == (1, 0, 0, 0)
+    exporter.close()
+    conn = sqlite3.connect(tmp_path.joinpath('scenery.sqlite'))
+    assert conn.execute('SELECT COUNT(*) FROM files').fetchone()[0] == 2
+
+
+def test_parquet_failed_file_is_not_current(tmp_path):
+    pytest.importorskip('pyarrow')
+    root = write_tree(tmp_path)
+    output = tmp_path.joinpath('parquet')
+    exporter = ParquetExporter(output)
+    assert exporter.export_tree(root) == (1, 0, 0, 1)
+    exporter.close()
+    exporter = ParquetExporter(output)
+    assert list(exporter.manifest) == [str(root.joinpath('good.bgl'))]
+    assert not any(list(output.joinpath(table).glob(exporter._key(str(root.joinpath('bad.bgl'))) + '*'))
+                   for table in ('airports', 'runways', 'starts'))
+    exporter.close()
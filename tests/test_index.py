@@ -0,0 +1,53 @@
+import os
+
+from lib.index import get_index, index_path, load_index, parse_indexed_airport
+from lib.rename import RenameOptions, apply_changes, read_changes
+
+
+def open_index(bgl_file, index_dir=None, write=True):
+    with open(bgl_file, 'rb') as f:
+        return get_index(bgl_file, f, index_dir, write)
+
+
+def test_index_round_trip(bgl_file):
+    assert load_index(bgl_file) is None
+    index = open_index(bgl_file)
+    assert [airport.ident for airport in index.airports] == ['KTUS', 'ENSB']
+    loaded = load_index(bgl_file)
+    assert loaded is not None and loaded.to_dict() == index.to_dict()
+    with open(bgl_file, 'rb') as f:
+        assert parse_indexed_airport(f, loaded, 'ENSB').ident.val == 'ENSB'
+        assert parse_indexed_airport(f, loaded, 'ZZZZ') is None
+
+
+def test_index_invalidated_by_changed_file(bgl_file):
+    index = open_index(bgl_file)
+    stat = bgl_file.stat()
+    os.utime(bgl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert load_index(bgl_file) is None
+    rebuilt = open_index(bgl_file)
+    assert rebuilt.mtime == bgl_file.stat().st_mtime_ns != index.mtime
+    assert load_index(bgl_file).mtime == rebuilt.mtime
+    index_path(bgl_file).write_text('{"version": 1}')
+    assert load_index(bgl_file) is None
+
+
+def test_index_dir_and_write_flag(tmp_path, bgl_file):
+    index_dir = tmp_path.joinpath('indexes')
+    open_index(bgl_file, index_dir, write=False)
+    assert not index_dir.exists()
+    open_index(bgl_file, index_dir)
+    assert index_path(bgl_file, index_dir).parent == index_dir
+    assert load_index(bgl_file, index_dir) is not None
+    assert not index_path(bgl_file).exists()
+
+
+def test_index_follows_applied_changes(tmp_path, bgl_file):
+    csv_file = tmp_path.joinpath('runways.csv')
+    csv_file.write_text(str(bgl_file) + ';KTUS;03;04\n')
+    options = RenameOptions(test_mode=True, use_index=True)
+    apply_changes(read_changes(csv_file, None, options), None, options)
+    assert not index_path(bgl_file).exists()
+    options = RenameOptions(use_index=True)
+    apply_changes(read_changes(csv_file, None, options), None, options)
+    assert load_index(bgl_file) is not None
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from lib.layers import LayerResolver
+from lib.rename import RenameOptions, read_changes
+
+from .synthetic import sample_bgl
+
+
+def package(root: Path, layer: str, name: str, files: list, layout: list = None) -> Path:
+    path = root.joinpath(layer, name)
+    path.mkdir(parents=True)
+    path.joinpath('manifest.json').write_text('{}')
+    for file in files:
+        path.joinpath(file).parent.mkdir(parents=True, exist_ok=True)
+        path.joinpath(file).write_bytes(sample_bgl())
+    if layout is not None:
+        path.joinpath('layout.json').write_text(json.dumps({'content': [{'path': file} for file in layout]}))
+    return path
+
+
+def content_xml(root: Path, packages: list) -> None:
+    root.joinpath('Content.xml').write_text(
+        '<Content>' + ''.join('<Package name="' + name + '" active="' + ('true' if active else 'false') + '"/>'
+                              for name, active in packages) + '</Content>')
+
+
+def resolve(tmp_path: Path, root: Path) -> list:
+    csv_file = tmp_path.joinpath('runways.csv')
+    csv_file.write_text(';KTUS;03;04\n')
+    options = RenameOptions(filter_bundle=tmp_path.joinpath('filters.json'), resolve_layers=True)
+    return [change.bgl for change in read_changes(csv_file, root, options)]
+
+
+def test_community_overrides_official(tmp_path, capsys):
+    root = tmp_path.joinpath('msfs')
+    base = package(root, 'Official/OneStore', 'base', ['scenery/world.bgl'])
+    addon = package(root, 'Community', 'addon', ['scenery/ktus.bgl'])
+    resolver = LayerResolver(root)
+    assert [package.name for package in resolver.packages] == ['base', 'addon']
+    assert resolver.effective([addon.joinpath('scenery/ktus.bgl'), base.joinpath('scenery/world.bgl')]) \
+        == addon.joinpath('scenery/ktus.bgl')
+    assert resolve(tmp_path, root) == [addon.joinpath('scenery/ktus.bgl')]
+    out = capsys.readouterr().out
+    assert 'WARN: Airport KTUS in ' + str(base.joinpath('scenery/world.bgl')) + ' is overridden by' in out
+    assert '(Community/addon)' in out
+
+
+def test_content_order_and_inactive_packages(tmp_path, capsys):
+    root = tmp_path.joinpath('msfs')
+    first = package(root, 'Community', 'a-first', ['ktus.bgl'])
+    second = package(root, 'Community', 'b-second', ['ktus.bgl'])
+    assert resolve(tmp_path, root) == [second.joinpath('ktus.bgl')]
+    content_xml(root, [('b-second', True), ('a-first', True)])
+    assert [package.name for package in LayerResolver(root).packages] == ['b-second', 'a-first']
+    assert resolve(tmp_path, root) == [first.joinpath('ktus.bgl')]
+    content_xml(root, [('b-second', True), ('a-first', False)])
+    capsys.readouterr()
+    assert resolve(tmp_path, root) == [second.joinpath('ktus.bgl')]
+    out = capsys.readouterr().out
+    assert 'WARN: BGL is not loaded by the sim (Community/a-first (inactive)), skipped: ' \
+        + str(first.joinpath('ktus.bgl')) in out
+
+
+def test_layout_membership(tmp_path, capsys):
+    root = tmp_path.joinpath('msfs')
+    addon = package(root, 'Community', 'addon', ['scenery/ktus.bgl', 'scenery/old/KTUS.bgl'],
+                    layout=['scenery/old/ktus.bgl'])
+    resolver = LayerResolver(root)
+    assert resolver.is_loaded(addon.joinpath('scenery/old/KTUS.bgl'))
+    assert not resolver.is_loaded(addon.joinpath('scenery/ktus.bgl'))
+    assert not resolver.is_loaded(tmp_path.joinpath('elsewhere.bgl'))
+    assert resolve(tmp_path, root) == [addon.joinpath('scenery/old/KTUS.bgl')]
+    assert 'WARN: BGL is not loaded by the sim (Community/addon), skipped: ' + str(addon.joinpath('scenery/ktus.bgl')) \
+        in capsys.readouterr().out
+
+
+def test_effective_ties_within_a_package(tmp_path):
+    root = tmp_path.joinpath('msfs')
+    addon = package(root, 'Community', 'addon', ['scenery/a.bgl', 'scenery/b.bgl'])
+    bgl_files = [addon.joinpath('scenery/b.bgl'), addon.joinpath('scenery/a.bgl')]
+    assert LayerResolver(root).effective(bgl_files) == addon.joinpath('scenery/b.bgl')
+    assert LayerResolver(root).effective(reversed(bgl_files)) == addon.joinpath('scenery/b.bgl')
+    assert LayerResolver(root).effective([]) is None
+    assert resolve(tmp_path, root) == [addon.joinpath('scenery/b.bgl')]
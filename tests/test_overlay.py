@@ -0,0 +1,18 @@
+from lib.overlay import PatchOverlay
+from lib.util import read
+
+
+def test_read_after_write_leaves_file_untouched(bgl_file):
+    original = bgl_file.read_bytes()
+    with open(bgl_file, 'rb') as f, PatchOverlay(f) as overlay:
+        overlay.seek(0x40)
+        overlay.write(b'\x01\x02')
+        overlay.seek(0x43)
+        overlay.write(b'\x03')
+        assert read(overlay, 0x3F, 6) == original[0x3F:0x40] + b'\x01\x02' + original[0x42:0x43] + b'\x03' \
+            + original[0x44:0x45]
+        assert overlay.original(0x40, 2) == original[0x40:0x42]
+        assert overlay.tell() == 0x45
+        overlay.seek(0)
+        assert len(overlay.read()) == len(original)
+    assert bgl_file.read_bytes() == original
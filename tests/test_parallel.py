@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.parallel import parse_bgl_parallel
+from lib.parser import read_bgl
+
+from .synthetic import build_bgl, waypoint
+
+
+def test_threads_merge_subsections_in_file_order(tmp_path):
+    path = tmp_path.joinpath('navdata.bgl')
+    path.write_bytes(build_bgl([(0x22, [[waypoint('W' + str(x) + str(y), 'K2', y, x) for y in range(20)]
+                                        for x in range(8)])]))
+    with ThreadPoolExecutor(4) as executor:
+        parallel = parse_bgl_parallel(path, executor)
+    serial = read_bgl(path)
+    assert [waypoint.ident.val for waypoint in parallel.waypoints] == \
+           [waypoint.ident.val for waypoint in serial.waypoints]
+    assert [waypoint.offset for waypoint in parallel.waypoints] == [waypoint.offset for waypoint in serial.waypoints]
+
+
+def test_without_executor_matches_serial_parse(bgl_file):
+    assert [airport.ident.val for airport in parse_bgl_parallel(bgl_file).airports] == ['KTUS', 'ENSB']
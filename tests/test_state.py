@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+
+from lib.rename import RenameOptions, apply_changes, read_changes
+from lib.state import RunState, hash_row
+
+
+def write_changes(tmp_path: Path, bgl_file: Path, rows: list) -> Path:
+    csv_file = tmp_path.joinpath('runways.csv')
+    csv_file.write_text(''.join(str(bgl_file) + ';' + row + '\n' for row in rows))
+    return csv_file
+
+
+def run(tmp_path: Path, bgl_file: Path, rows: list) -> str:
+    options = RenameOptions(state_file=tmp_path.joinpath('state.json'))
+    changes = read_changes(write_changes(tmp_path, bgl_file, rows), None, options)
+    return apply_changes(changes, None, options)[0].status
+
+
+def test_applied_rows_round_trip(tmp_path, bgl_file):
+    assert run(tmp_path, bgl_file, ['KTUS;03;04']) == 'applied'
+    state = RunState(tmp_path.joinpath('state.json'))
+    assert list(state.applied_rows(bgl_file)) == [hash_row([str(bgl_file), 'KTUS', '03', '04'])]
+    assert run(tmp_path, bgl_file, ['KTUS;03;04']) == 'skipped'
+
+
+def test_applied_rows_detects_reverted_file(tmp_path, bgl_file):
+    original = bgl_file.read_bytes()
+    run(tmp_path, bgl_file, ['KTUS;03;04'])
+    bgl_file.write_bytes(original)
+    assert RunState(tmp_path.joinpath('state.json')).applied_rows(bgl_file) == {}
+    assert run(tmp_path, bgl_file, ['KTUS;03;04']) == 'applied'
+
+
+def test_rows_without_patches_are_not_applied(tmp_path, bgl_file):
+    rows = ['KTUS;09;10', 'ZZZZ;03;04']
+    assert run(tmp_path, bgl_file, rows) == 'applied'
+    assert RunState(tmp_path.joinpath('state.json')).applied_rows(bgl_file) == {}
+    assert run(tmp_path, bgl_file, rows) == 'applied'
+
+
+def test_refreshed_entry_is_saved(tmp_path, bgl_file):
+    run(tmp_path, bgl_file, ['KTUS;03;04'])
+    stat = bgl_file.stat()
+    os.utime(bgl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert run(tmp_path, bgl_file, ['KTUS;03;04']) == 'skipped'
+    state = RunState(tmp_path.joinpath('state.json'))
+    assert state.files[str(bgl_file)]['mtime'] == bgl_file.stat().st_mtime_ns
+    assert not state.dirty